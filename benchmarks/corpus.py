@@ -0,0 +1,123 @@
+import os
+import random
+import subprocess
+
+BASE_BRANCH = "bench-base"
+
+# name: (python files, javascript files, functions added per file,
+#        functions changed per file)
+SCENARIOS = {
+    "small": (1, 0, 2, 1),
+    "medium": (6, 2, 8, 4),
+    "large": (20, 5, 16, 8),
+}
+
+NAMES = [
+    "load",
+    "parse",
+    "render",
+    "update",
+    "merge",
+    "resolve",
+    "fetch",
+    "normalize",
+    "validate",
+    "collect",
+]
+
+
+def _python_function(rng, name):
+    args = ", ".join(rng.sample(["items", "limit", "key", "value", "path"], 2))
+    body = [
+        f"def {name}({args}):",
+        "    result = []",
+        "    for index, item in enumerate(items if isinstance(items, list) else []):",
+        f"        if index > {rng.randint(1, 50)}:",
+        "            break",
+        "        result.append(str(item).strip())",
+    ]
+    for i in range(rng.randint(2, 12)):
+        body.append(f"    total_{i} = len(result) * {rng.randint(1, 9)} + {i}")
+    body += ["    return result", "", ""]
+    return body
+
+
+def _javascript_function(rng, name):
+    body = [f"function {name}(items, limit) {{", "  const result = [];"]
+    for i in range(rng.randint(2, 12)):
+        body.append(f"  const total{i} = result.length * {rng.randint(1, 9)} + {i};")
+    body += ["  return result;", "}", ""]
+    return body
+
+
+def _module(rng, make_function, prefix, count):
+    lines = []
+    for i in range(count):
+        lines += make_function(rng, f"{rng.choice(NAMES)}_{prefix}{i}")
+    return lines
+
+
+def _write(path, lines):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def _git(directory, *args):
+    subprocess.run(
+        ["git", *args],
+        cwd=directory,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def build_repo(directory, scenario, seed=0):
+    """
+    Creates a git repository whose ``HEAD`` differs from ``BASE_BRANCH`` by
+    the change set of ``scenario``. The same scenario and seed always
+    produce byte-identical diffs, so results are comparable across versions.
+
+    Returns:
+        int: Number of added lines in the diff.
+    """
+    python_files, javascript_files, added, changed = SCENARIOS[scenario]
+    rng = random.Random(f"{scenario}:{seed}")
+    os.makedirs(directory, exist_ok=True)
+    _git(directory, "init", "-q", "-b", BASE_BRANCH)
+    _git(directory, "config", "user.email", "bench@example.com")
+    _git(directory, "config", "user.name", "bench")
+
+    files = [(f"pkg/module_{i}.py", _python_function) for i in range(python_files)] + [
+        (f"web/module_{i}.js", _javascript_function) for i in range(javascript_files)
+    ]
+    bases = {}
+    for path, make_function in files:
+        bases[path] = _module(rng, make_function, "base", 10)
+        _write(os.path.join(directory, path), bases[path])
+    _git(directory, "add", "-A")
+    _git(directory, "commit", "-q", "-m", "base")
+    _git(directory, "checkout", "-q", "-b", "bench-head")
+
+    for path, make_function in files:
+        lines = list(bases[path])
+        # Change one line in each of the first ``changed`` functions.
+        remaining = changed
+        for i, line in enumerate(lines):
+            if remaining and line.startswith(("    total_0", "  const total0")):
+                lines[i] = line.replace("+ 0", "+ 100")
+                remaining -= 1
+        lines += _module(rng, make_function, "new", added)
+        _write(os.path.join(directory, path), lines)
+    _git(directory, "add", "-A")
+    _git(directory, "commit", "-q", "-m", "head")
+
+    diff = subprocess.run(
+        ["git", "diff", "--numstat", BASE_BRANCH, "HEAD"],
+        cwd=directory,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return sum(int(line.split()[0]) for line in diff.splitlines())
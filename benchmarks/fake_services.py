@@ -0,0 +1,366 @@
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+from urllib.parse import parse_qs, unquote, urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SEGMENT_PATTERN = re.compile(r"### Segment \d+: `([^`]+)`")
+CHANGED_PATTERN = re.compile(r"^(\d+): \[CHANGED\]", re.MULTILINE)
+
+
+def count_tokens(text):
+    # Same estimate the bot uses for its own budgets.
+    return len(text) // 4 + 1
+
+
+class Recorder:
+    """
+    Thread-safe call log shared by a fake server and the benchmark runner.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = []
+            self.totals = {}
+
+    def record(self, method, path, **counters):
+        with self._lock:
+            self.calls.append((method, path))
+            for name, value in counters.items():
+                self.totals[name] = self.totals.get(name, 0) + value
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.calls), dict(self.totals)
+
+
+class PrefixCache:
+    """
+    Models Ollama's per-slot KV cache: a prompt only pays for the tokens
+    after the longest prefix it shares with the prompt last evaluated in one
+    of ``slots`` slots, and then takes over that slot (or the least recently
+    used one).
+    """
+
+    def __init__(self, slots=4):
+        self.slots = slots
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._prompts = []
+
+    def evaluate(self, prompt):
+        """
+        Returns the number of tokens of ``prompt`` that need evaluating.
+        """
+        with self._lock:
+            best, shared = None, 0
+            for index, cached in enumerate(self._prompts):
+                length = len(os.path.commonprefix([cached, prompt]))
+                if best is None or length > shared:
+                    best, shared = index, length
+            if shared:
+                self._prompts.pop(best)
+            elif len(self._prompts) >= self.slots:
+                self._prompts.pop(0)
+            self._prompts.append(prompt)
+            return count_tokens(prompt) - shared // 4
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except ConnectionResetError:
+            # Pooled keep-alive connections are dropped when the client exits.
+            pass
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length))
+
+    def _send(self, status, body=b"", content_type="application/json", headers=()):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _review_response(prompt):
+    # One finding on the first changed line, attributed to the first segment
+    # of a packed prompt, so the demultiplexing path is exercised.
+    match = CHANGED_PATTERN.search(prompt)
+    finding = {
+        "line": int(match.group(1)) if match else 1,
+        "type": "readability",
+        "severity": "low",
+        "message": "Consider a more descriptive name.",
+    }
+    segment = SEGMENT_PATTERN.search(prompt)
+    if segment:
+        finding["path"] = segment.group(1)
+    return json.dumps([finding])
+
+
+class FakeOllamaHandler(_Handler):
+    """
+    Minimal ``/api/generate`` and ``/api/ps`` with simulated latency.
+
+    Prompt evaluation takes ``prompt_tokens / prompt_tps`` seconds and each
+    generated token ``1 / tps`` seconds, so token latency and throughput can
+    be tuned per run. Tokens already in ``prefix_cache``, or in a ``context``
+    sent with the request, are not evaluated again.
+    """
+
+    recorder = None
+    prefix_cache = None
+    prompt_tps = 500.0
+    tps = 50.0
+    response_tokens = 40
+
+    def do_GET(self):
+        self.recorder.record("GET", self.path)
+        if self.path == "/api/ps":
+            self._send(200, json.dumps({"models": []}).encode())
+        else:
+            self._send(404)
+
+    def do_POST(self):
+        body = self._read_json()
+        if self.path != "/api/generate":
+            self.recorder.record("POST", self.path)
+            self._send(404)
+            return
+
+        prompt = body.get("prompt")
+        if not prompt:
+            # Load or unload request.
+            self.recorder.record("POST", self.path, ollama_load_calls=1)
+            self._send(200, json.dumps({"done": True}).encode())
+            return
+
+        system = body.get("system", "")
+        context = body.get("context") or []
+        rendered = f"{system}\n{prompt}" if system else prompt
+        prompt_tokens = count_tokens(rendered) + len(context)
+        if context:
+            # The context is what the slot evaluated last.
+            evaluated = count_tokens(prompt)
+        elif self.prefix_cache is not None:
+            evaluated = self.prefix_cache.evaluate(rendered)
+        else:
+            evaluated = count_tokens(rendered)
+        if (
+            prompt.startswith("Review the code")
+            or "Return JSON" in prompt
+            or "JSON array" in prompt
+        ):
+            text = _review_response(prompt)
+        elif "### Function " in prompt:
+            count = len(re.findall(r"^\s*### Function \d+$", prompt, re.MULTILINE))
+            text = json.dumps(
+                {
+                    str(i): "Summary line.\n\nReturns:\n    None: nothing."
+                    for i in range(1, count + 1)
+                }
+            )
+        elif "docstring" in prompt:
+            text = "Summary line.\n\nReturns:\n    None: nothing."
+        else:
+            text = "def test_generated():\n    assert True\n"
+        words = text.split(" ")
+        pad = max(0, self.response_tokens - len(words))
+
+        self.recorder.record(
+            "POST",
+            self.path,
+            ollama_calls=1,
+            prompt_tokens=prompt_tokens,
+            prompt_eval_tokens=evaluated,
+            prompt_eval_seconds=evaluated / self.prompt_tps,
+            generated_tokens=len(words) + pad,
+        )
+        time.sleep(evaluated / self.prompt_tps)
+        time.sleep(pad / self.tps)
+        stats = {
+            "prompt_eval_count": evaluated,
+            "prompt_eval_duration": int(evaluated / self.prompt_tps * 1e9),
+            "eval_count": len(words) + pad,
+            "eval_duration": int((len(words) + pad) / self.tps * 1e9),
+            "context": list(range(prompt_tokens + len(words) + pad)),
+        }
+
+        if not body.get("stream", True):
+            time.sleep(len(words) / self.tps)
+            payload = dict(stats, model=body.get("model"), response=text, done=True)
+            self._send(200, json.dumps(payload).encode())
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for i, word in enumerate(words):
+                time.sleep(1 / self.tps)
+                piece = word if i == 0 else " " + word
+                self._write_chunk({"response": piece, "done": False})
+            self._write_chunk(dict(stats, response="", done=True))
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client closes the stream once the review array is complete.
+            pass
+
+    def _write_chunk(self, data):
+        line = (json.dumps(data) + "\n").encode()
+        self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+        self.wfile.flush()
+
+
+PULL_PATTERN = re.compile(r"^/repos/[^/]+/[^/]+/pulls/\d+$")
+PULL_FILES_PATTERN = re.compile(r"^/repos/[^/]+/[^/]+/pulls/\d+/files$")
+CONTENTS_PATTERN = re.compile(r"^/repos/[^/]+/[^/]+/contents/(.+)$")
+
+
+class FakeGitHubHandler(_Handler):
+    """
+    Records every GitHub API call and answers with empty lists and
+    plausible created objects.
+
+    When ``repository`` is set to a git repository, pull requests are the
+    diff of its ``HEAD`` against ``base`` and the contents API serves its
+    files, as needed by runs without a checkout. With ``diff_too_large``
+    the diff media type is refused with 406, as GitHub does for large pull
+    requests, and the files endpoint has to be paged through instead.
+    """
+
+    recorder = None
+    repository = None
+    base = None
+    diff_too_large = False
+    files_per_page = 2
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if self.repository and PULL_PATTERN.match(url.path):
+            if "diff" in self.headers.get("Accept", ""):
+                self.recorder.record("GET", self.path, github_requests=1)
+                if self.diff_too_large:
+                    self._send(406, b'{"message": "diff too large"}')
+                    return
+                self._send(200, self._git("diff", f"{self.base}...HEAD"), "text/plain")
+            else:
+                self.recorder.record("GET", self.path, github_requests=1)
+                pull = {
+                    "head": {"sha": self._git("rev-parse", "HEAD").decode().strip()},
+                    "base": {
+                        "sha": self._git("merge-base", self.base, "HEAD")
+                        .decode()
+                        .strip()
+                    },
+                }
+                self._send(200, json.dumps(pull).encode())
+            return
+        if self.repository and PULL_FILES_PATTERN.match(url.path):
+            self.recorder.record("GET", self.path, github_requests=1)
+            page = int(parse_qs(url.query).get("page", ["1"])[0])
+            files = self._pull_files()
+            start = (page - 1) * self.files_per_page
+            headers = ()
+            if start + self.files_per_page < len(files):
+                headers = (("Link", f'<{url.path}?page={page + 1}>; rel="next"'),)
+            body = json.dumps(files[start : start + self.files_per_page])
+            self._send(200, body.encode(), headers=headers)
+            return
+        match = CONTENTS_PATTERN.match(url.path)
+        if self.repository and match:
+            self.recorder.record("GET", self.path, github_requests=1, github_blobs=1)
+            ref = parse_qs(url.query).get("ref", ["HEAD"])[0]
+            try:
+                body = self._git("show", f"{ref}:{unquote(match.group(1))}")
+            except subprocess.CalledProcessError:
+                self._send(404, b'{"message": "Not Found"}')
+                return
+            self._send(200, body, "application/vnd.github.raw")
+            return
+        self.recorder.record("GET", self.path, github_requests=1)
+        self._send(200, b"[]")
+
+    def _pull_files(self):
+        # The files endpoint's view of the diff: one entry per file with the
+        # hunks of its patch and no file headers.
+        diff = self._git("diff", "-M", f"{self.base}...HEAD").decode()
+        files = []
+        for chunk in re.split(r"^(?=diff --git )", diff, flags=re.MULTILINE):
+            if not chunk:
+                continue
+            header, _, patch = chunk.partition("\n@@")
+            names = re.search(r"^diff --git a/(.+) b/(.+)$", header, re.MULTILINE)
+            entry = {"filename": names.group(2), "status": "modified"}
+            if "\nnew file mode" in header:
+                entry["status"] = "added"
+            elif "\ndeleted file mode" in header:
+                entry["status"] = "removed"
+            elif "\nrename from" in header:
+                entry["status"] = "renamed"
+                entry["previous_filename"] = names.group(1)
+            if patch:
+                entry["patch"] = ("@@" + patch).rstrip("\n")
+            files.append(entry)
+        return files
+
+    def _git(self, *args):
+        return subprocess.check_output(
+            ["git", *args], cwd=self.repository, stderr=subprocess.DEVNULL
+        )
+
+    def do_POST(self):
+        body = self._read_json()
+        comments = len(body.get("comments", []))
+        self.recorder.record(
+            "POST",
+            self.path,
+            github_requests=1,
+            github_writes=1,
+            github_inline_comments=comments,
+        )
+        self._send(201, json.dumps({"id": 1, "body": body.get("body", "")}).encode())
+
+    def do_PATCH(self):
+        body = self._read_json()
+        self.recorder.record("PATCH", self.path, github_requests=1, github_writes=1)
+        self._send(200, json.dumps({"id": 1, "body": body.get("body", "")}).encode())
+
+
+def start(handler, **attributes):
+    """
+    Starts ``handler`` on a free local port in a daemon thread.
+
+    Returns:
+        tuple: ``(server, url, recorder)``.
+    """
+    recorder = Recorder()
+    handler = type(handler.__name__, (handler,), dict(attributes, recorder=recorder))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", recorder
@@ -0,0 +1,150 @@
+"""
+Micro-benchmark of the diff line model used to build review prompts.
+
+Parses a synthetic diff once, then times turning every hunk into a review
+segment (line model plus rendered prompt text) with the current
+``DiffLines`` model and with the previous dict-per-line model, and measures
+the memory each keeps alive for the whole diff.
+
+Usage:
+    python benchmarks/line_model.py --lines 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from unidiff import PatchSet  # noqa: E402
+
+from smart_code_review_bot.main import build_segment  # noqa: E402
+
+
+def legacy_segment(hunk, path):
+    # The dict-per-line model this benchmark compares against.
+    changed_lines = {}
+    added_lines = set()
+    for line in hunk:
+        if line.is_added or line.is_context:
+            line_num = line.target_line_no
+            if line_num:
+                changed_lines[line_num] = {
+                    "content": line.value,
+                    "type": "add" if line.is_added else "normal",
+                    "position": line_num,
+                }
+                if line.is_added:
+                    added_lines.add(line_num)
+    if not changed_lines:
+        return None
+    added_lines = sorted(added_lines)
+    added = set(added_lines)
+    line_numbers = sorted(changed_lines)
+    content = "\n".join(
+        f"{line_num}: {'[CHANGED]' if line_num in added else ''} {changed_lines[line_num]['content'].strip()}"
+        for line_num in line_numbers
+    )
+    return {
+        "path": path,
+        "context": changed_lines,
+        "added_lines": added_lines,
+        "start": line_numbers[0],
+        "end": line_numbers[-1],
+        "content": content,
+    }
+
+
+def synthetic_diff(total_lines, hunk_lines=60, seed=0):
+    """
+    Builds a unified diff of ``total_lines`` new-side lines split into
+    hunks, two thirds of them added.
+    """
+    rng = random.Random(seed)
+    out = []
+    file_index = 0
+    written = 0
+    while written < total_lines:
+        path = f"src/module_{file_index}.py"
+        out.append(f"diff --git a/{path} b/{path}\n--- a/{path}\n+++ b/{path}\n")
+        line_no = 1
+        for _ in range(20):
+            body = []
+            old_count = new_count = 0
+            for i in range(hunk_lines):
+                text = (
+                    f"    value_{i} = compute(value_{i - 1}, {rng.randint(0, 999)})\n"
+                )
+                if rng.random() < 2 / 3:
+                    body.append("+" + text)
+                    new_count += 1
+                else:
+                    body.append(" " + text)
+                    old_count += 1
+                    new_count += 1
+            out.append(f"@@ -{line_no},{old_count} +{line_no},{new_count} @@\n")
+            out.extend(body)
+            line_no += new_count + 10
+            written += new_count
+            if written >= total_lines:
+                break
+        file_index += 1
+    return "".join(out)
+
+
+def measure(build, hunks, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for path, hunk in hunks:
+            build(hunk, path)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    kept = [build(hunk, path) for path, hunk in hunks]
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return best, retained, peak
+
+
+class _File:
+    def __init__(self, path):
+        self.path = path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    files = PatchSet(synthetic_diff(args.lines))
+    hunks = [(file.path, hunk) for file in files for hunk in file]
+
+    for path, hunk in hunks[:50]:
+        old = legacy_segment(hunk, path)
+        new = build_segment(hunk, _File(path))
+        assert old["content"] == new["content"]
+        assert old["added_lines"] == new["added_lines"]
+
+    models = {
+        "dict per line": legacy_segment,
+        "DiffLines": lambda hunk, path: build_segment(hunk, _File(path)),
+    }
+    print(f"{len(hunks)} hunks, {args.lines} new-side lines")
+    for name, build in models.items():
+        seconds, retained, peak = measure(build, hunks, args.repeat)
+        print(
+            f"   {name}: {seconds * 1000:.0f} ms, "
+            f"{retained / 1e6:.1f} MB retained, {peak / 1e6:.1f} MB peak"
+        )
+
+
+if __name__ == "__main__":
+    main()
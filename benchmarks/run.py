@@ -0,0 +1,296 @@
+"""
+Offline benchmark of the review pipeline.
+
+Replays the seeded diffs of ``corpus.SCENARIOS`` through ``pipeline.py``
+(review, unit test and docstring stages) against a local fake Ollama with
+configurable latency and a fake GitHub API that records every call, and
+reports per scenario:
+
+- end-to-end wall time
+- Ollama generate calls, prompt and generated tokens
+- prompt tokens actually evaluated and prompt evaluation time per call,
+  with the fake modelling Ollama's KV cache reuse of shared prompt prefixes
+- GitHub requests and writes
+- peak RSS of the pipeline process
+
+Usage:
+    python benchmarks/run.py --scenarios small,medium --output results.json
+    python benchmarks/run.py --baseline results.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import corpus
+import fake_services
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PIPELINE = "smart_code_review_bot.pipeline"
+
+# Metrics compared against a baseline; higher is worse for all of them.
+COMPARED = (
+    "wall_time_s",
+    "ollama_calls",
+    "prompt_tokens",
+    "prompt_eval_tokens",
+    "prompt_eval_ms_per_call",
+    "github_requests",
+    "peak_rss_kb",
+)
+
+
+def run_scenario(scenario, args, ollama, github):
+    ollama_server, ollama_url, ollama_calls = ollama
+    github_server, github_url, github_calls = github
+
+    with tempfile.TemporaryDirectory(prefix=f"bench-{scenario}-") as workdir:
+        repo = os.path.join(workdir, "repo")
+        added_lines = corpus.build_repo(repo, scenario, seed=args.seed)
+        head_sha = subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=repo, text=True
+        ).strip()
+
+        env = dict(
+            os.environ,
+            BASE_BRANCH=corpus.BASE_BRANCH,
+            GITHUB_TOKEN="bench",
+            GITHUB_REPOSITORY="bench/repo",
+            GITHUB_REPOSITORY_OWNER="bench",
+            GITHUB_SHA=head_sha,
+            PR_NUMBER="1",
+            GITHUB_API_URL=github_url,
+            OLLAMA_HOSTS=ollama_url,
+            # A cold cache every run, so runs are comparable.
+            REVIEW_CACHE_DIR=os.path.join(workdir, "cache"),
+            REVIEW_METRICS_JSON=os.path.join(workdir, "metrics.json"),
+            PYTHONPATH=os.pathsep.join(
+                filter(None, [os.path.join(ROOT, "src"), os.getenv("PYTHONPATH")])
+            ),
+        )
+        env.pop("REVIEW_MODE", None)
+        env.pop("REVIEW_SOURCE", None)
+
+        ollama_calls.reset()
+        github_calls.reset()
+        ollama_server.RequestHandlerClass.prefix_cache.reset()
+        github_server.RequestHandlerClass.repository = repo
+        github_server.RequestHandlerClass.base = corpus.BASE_BRANCH
+        cwd = repo
+        if args.no_checkout:
+            env["REVIEW_SOURCE"] = "github"
+            cwd = os.path.join(workdir, "empty")
+            os.makedirs(cwd)
+        log_path = os.path.join(workdir, "pipeline.log")
+        with open(log_path, "w") as log:
+            started = time.perf_counter()
+            process = subprocess.Popen(
+                [sys.executable, "-m", PIPELINE, "--stages", args.stages],
+                cwd=cwd,
+                env=env,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+            _, status, usage = os.wait4(process.pid, 0)
+            wall_time = time.perf_counter() - started
+        process.returncode = os.waitstatus_to_exitcode(status)
+
+        if process.returncode and args.verbose:
+            with open(log_path) as log:
+                print(log.read())
+
+        try:
+            with open(env["REVIEW_METRICS_JSON"]) as f:
+                pipeline_metrics = json.load(f)
+        except (OSError, ValueError):
+            pipeline_metrics = {}
+
+        _, ollama_totals = ollama_calls.snapshot()
+        _, github_totals = github_calls.snapshot()
+        calls = ollama_totals.get("ollama_calls", 0)
+        return {
+            "added_lines": added_lines,
+            "exit_code": process.returncode,
+            "wall_time_s": round(wall_time, 3),
+            "ollama_calls": calls,
+            "ollama_load_calls": ollama_totals.get("ollama_load_calls", 0),
+            "prompt_tokens": ollama_totals.get("prompt_tokens", 0),
+            "prompt_eval_tokens": ollama_totals.get("prompt_eval_tokens", 0),
+            "prompt_eval_ms_per_call": (
+                round(ollama_totals.get("prompt_eval_seconds", 0) / calls * 1000, 1)
+                if calls
+                else 0.0
+            ),
+            "generated_tokens": ollama_totals.get("generated_tokens", 0),
+            "github_requests": github_totals.get("github_requests", 0),
+            "github_writes": github_totals.get("github_writes", 0),
+            "github_inline_comments": github_totals.get("github_inline_comments", 0),
+            "github_blobs": github_totals.get("github_blobs", 0),
+            # ru_maxrss is in kilobytes on Linux.
+            "peak_rss_kb": usage.ru_maxrss,
+            # Per-stage timings and model statistics reported by the pipeline.
+            "spans": pipeline_metrics.get("spans", {}),
+            "models": pipeline_metrics.get("models", {}),
+        }
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints metrics that got worse than ``baseline`` by more than
+    ``threshold`` and returns how many did.
+    """
+    regressions = 0
+    for scenario, metrics in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(scenario)
+        if before is None:
+            continue
+        for name in COMPARED:
+            old, new = before.get(name), metrics.get(name)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if change > threshold:
+                regressions += 1
+                print(f"❌ {scenario} {name}: {old} -> {new} (+{change:.0%})")
+            elif change < -threshold:
+                print(f"✅ {scenario} {name}: {old} -> {new} ({change:.0%})")
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "describe", "--always", "--dirty"], cwd=ROOT, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(corpus.SCENARIOS),
+        help=f"Comma separated scenarios (default: {','.join(corpus.SCENARIOS)})",
+    )
+    parser.add_argument(
+        "--stages",
+        default="review,unittest,docstring",
+        help="Pipeline stages to run (default: all)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    parser.add_argument(
+        "--no-checkout",
+        action="store_true",
+        help="Run the pipeline outside the repository, reading the pull "
+        "request from the fake GitHub API",
+    )
+    parser.add_argument(
+        "--prompt-tps",
+        type=float,
+        default=2000.0,
+        help="Simulated prompt evaluation speed in tokens/s",
+    )
+    parser.add_argument(
+        "--tps",
+        type=float,
+        default=200.0,
+        help="Simulated generation speed in tokens/s",
+    )
+    parser.add_argument(
+        "--response-tokens",
+        type=int,
+        default=40,
+        help="Tokens generated per response",
+    )
+    parser.add_argument(
+        "--ollama-slots",
+        type=int,
+        default=4,
+        help="Prompt prefixes the fake Ollama keeps cached (default: 4)",
+    )
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against a previous results file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative change reported as a regression (default: 0.1)",
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="Print the log of failed runs"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(corpus.SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    ollama = fake_services.start(
+        fake_services.FakeOllamaHandler,
+        prompt_tps=args.prompt_tps,
+        tps=args.tps,
+        response_tokens=args.response_tokens,
+        prefix_cache=fake_services.PrefixCache(args.ollama_slots),
+    )
+    github = fake_services.start(fake_services.FakeGitHubHandler)
+
+    results = {
+        "revision": git_revision(),
+        "settings": {
+            "stages": args.stages,
+            "seed": args.seed,
+            "no_checkout": args.no_checkout,
+            "prompt_tps": args.prompt_tps,
+            "tps": args.tps,
+            "response_tokens": args.response_tokens,
+            "ollama_slots": args.ollama_slots,
+        },
+        "scenarios": {},
+    }
+    try:
+        for scenario in scenarios:
+            print(f"⏱️ Running {scenario}...")
+            metrics = run_scenario(scenario, args, ollama, github)
+            results["scenarios"][scenario] = metrics
+            print(
+                f"   {metrics['added_lines']} added lines: "
+                f"{metrics['wall_time_s']:.1f}s, "
+                f"{metrics['ollama_calls']} Ollama calls, "
+                f"{metrics['prompt_tokens']} prompt tokens "
+                f"({metrics['prompt_eval_tokens']} evaluated, "
+                f"{metrics['prompt_eval_ms_per_call']:.0f} ms per call), "
+                f"{metrics['github_requests']} GitHub requests, "
+                f"{metrics['peak_rss_kb'] / 1024:.0f} MB peak RSS"
+                + (
+                    f" (exit code {metrics['exit_code']})"
+                    if metrics["exit_code"]
+                    else ""
+                )
+            )
+    finally:
+        ollama[0].shutdown()
+        github[0].shutdown()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from setuptools import setup, find_packages
+from setuptools import find_packages, setup
 
 with open("requirements.txt") as f:
     requirements = f.read().splitlines()
@@ -23,7 +23,9 @@ setup(
     ],
     python_requires=">=3.9",
     entry_points={
-        "console_scripts": ["smart-code-review-bot=smart_code_review_bot.main:main"],
+        "console_scripts": [
+            "smart-code-review-bot=smart_code_review_bot.pipeline:main"
+        ],
     },
     include_package_data=True,
 )
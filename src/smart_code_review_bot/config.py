@@ -0,0 +1,167 @@
+REVIEW_CONFIG = {
+    "emojis": {
+        "type-safety": "🔒",
+        "architecture": "🏗️",
+        "readability": "📖",
+        "security": "🛡️",
+        "performance": "⚡",
+        "suggestion": "💡",
+        "good-practice": "✨",
+        "blocking": "🚫",
+        "ai-suggestion": "🤖",
+        "ai-issue": "⚠️",
+        "ai-praise": "👏",
+    },
+    "concurrencyLimit": 3,
+    "supportedExtensions": r".(js|jsx|ts|tsx|py|go|java|rb|php|cs)$",
+    "maxFileSize": 500000,  # 500KB
+    "http": {
+        "maxRetries": 3,
+        "backoffFactor": 1.0,  # seconds, doubled on every retry
+        "maxBackoff": 30,  # seconds
+        "rateLimitMaxWait": 120,  # seconds; longer waits are not retried
+        "poolMaxsize": 10,
+        "github": {"connectTimeout": 10, "readTimeout": 30},
+        "ollama": {"connectTimeout": 10, "readTimeout": 600},
+    },
+    # Skip findings already posted on the PR and extend existing comments.
+    "deduplicateComments": True,
+    # Static checks that skip hunks before they reach the model: whitespace,
+    # comment, import-order and version-only changes, formatting-only Python
+    # changes, and vendored, generated or minified files
+    "triage": {
+        "enabled": True,
+        "ignore": [],  # extra fnmatch globs, e.g. "docs/*" or "*.snap"
+        "maxLineLength": 500,  # added lines this long on average mean minified
+    },
+    # Off unless a limit is set here, by --time-budget/--token-budget or by
+    # REVIEW_TIME_BUDGET. Hunks are then reviewed riskiest first and the ones
+    # left over are listed in the review body.
+    "reviewBudget": {
+        "seconds": None,
+        "promptTokens": None,
+        "sensitivePaths": [
+            "*auth*",
+            "*security*",
+            "*crypto*",
+            "*password*",
+            "*secret*",
+            "*token*",
+            "*login*",
+            "*permission*",
+            "*payment*",
+            "*.sql",
+            "*/migrations/*",
+        ],
+        "languageWeights": {
+            "php": 1.3,
+            "js": 1.2,
+            "jsx": 1.2,
+            "ts": 1.1,
+            "tsx": 1.1,
+            "rb": 1.1,
+        },
+    },
+    "cache": {
+        "enabled": True,
+        # Overridden by the REVIEW_CACHE_DIR environment variable
+        "directory": "~/.cache/smart-code-review",
+        "maxEntries": 5000,
+        "maxSizeBytes": 50_000_000,  # 50MB
+        "maxAgeDays": 30,
+    },
+    # Docstrings and unit tests keyed by function AST, stored next to the reviews
+    "generationCache": {
+        "enabled": True,
+        "maxEntries": 5000,
+        "maxSizeBytes": 20_000_000,  # 20MB
+    },
+    # Conditional GET cache for GitHub API reads, stored next to the reviews
+    "githubCache": {
+        "enabled": True,
+        "maxEntries": 1000,
+        "maxSizeBytes": 50_000_000,  # 50MB
+    },
+    # Run summary files, also settable with the REVIEW_METRICS_JSON and
+    # REVIEW_METRICS_PROMETHEUS environment variables
+    "metrics": {
+        "jsonPath": None,
+        "prometheusPath": None,  # e.g. for the node exporter textfile collector
+    },
+    "tokenBudget": {
+        "maxHunkTokens": 1500,  # larger hunks are split
+        "overlapLines": 3,  # context shared between split pieces
+        "numPredict": 1024,  # tokens the model may generate per review
+        # num_ctx is rounded up to a power of two within these bounds so
+        # Ollama does not reload the model for every distinct size.
+        "minContextTokens": 2048,
+        "maxContextTokens": 8192,
+    },
+    "ollama": {
+        # Overridden by the comma separated OLLAMA_HOSTS environment variable.
+        # Entries may also be {"url": ..., "maxConcurrency": ...} dicts.
+        "endpoints": ["http://127.0.0.1:11434"],
+        "maxConcurrencyPerEndpoint": 3,
+        "healthCheckInterval": 30,  # seconds
+        "failureCooldown": 30,  # seconds a failed endpoint is skipped
+        "acquireTimeout": 900,  # seconds to wait for a free endpoint slot
+    },
+    # Functions whose docstrings are requested together in one generation
+    "docstrings": {
+        "batchSize": 8,
+        "maxBatchTokens": 2048,
+    },
+    "modelScheduling": {
+        "keepAlive": "30m",  # how long a model stays pinned between jobs
+        "unloadAfterGroup": True,
+    },
+    "packing": {
+        "enabled": True,
+        "maxPromptTokens": 2048,  # estimated tokens of code per prompt
+        "maxHunksPerPrompt": 12,
+        "crossFile": True,  # allow hunks of different files in one prompt
+    },
+    # Prompt prefix reuse: Ollama keeps the KV cache of the previous prompt,
+    # so instructions that are byte-identical across calls are only
+    # evaluated once per model slot.
+    "promptCache": {
+        "useSystemField": True,  # send reviewSystemPrompt as Ollama's system
+        # Pass the context returned for a file's previous hunk to its next
+        # one. Streams are then read to the end so Ollama returns a context.
+        "reuseContext": False,
+    },
+    # Shared by single and packed reviews; keep it free of per-call data.
+    "reviewSystemPrompt": """You are an expert code reviewer. You review code segments.
+Each segment is labeled with its file and line range.
+Each line starts with its line number and a [CHANGED] tag if modified.
+Only provide feedback for lines tagged [CHANGED].
+
+Focus on:
+- Type safety
+- Design patterns
+- Readability and maintainability
+- Security issues (use the exact line of risk)
+- Performance
+
+Return JSON output like this, using the file of the segment as "path":
+[
+  {
+    "path": "src/example.py",
+    "line": 42,
+    "type": "security",
+    "severity": "high",
+    "message": "<specific_issue_and_recommendation>"
+  }
+]
+""",
+    "reviewPrompt": """Review the code from file `{filename}`.
+Only provide feedback for the following lines: {changed_lines}.
+
+Code:
+{content}
+""",
+    "packedReviewPrompt": """Review the code segments below.
+
+{segments}
+""",
+}
@@ -0,0 +1,77 @@
+from array import array
+
+ADDED = 1
+CONTEXT = 0
+
+
+class DiffLines:
+    """
+    The new-side lines of a hunk, added and context lines in diff order.
+
+    Line numbers live in an ``array('i')`` and added/context flags in a
+    ``bytearray``, next to the line strings of the parsed diff themselves, so
+    a hunk costs three containers instead of a dict per line. Rendering the
+    prompt is a single join over them.
+    """
+
+    __slots__ = ("numbers", "flags", "texts")
+
+    def __init__(self, numbers=None, flags=None, texts=None):
+        self.numbers = numbers if numbers is not None else array("i")
+        self.flags = flags if flags is not None else bytearray()
+        self.texts = texts if texts is not None else []
+
+    @classmethod
+    def from_hunk(cls, hunk):
+        """
+        Collects the added and context lines of a ``unidiff.Hunk``.
+        """
+        lines = cls()
+        numbers, flags, texts = lines.numbers, lines.flags, lines.texts
+        for line in hunk:
+            if line.is_removed:
+                continue
+            line_num = line.target_line_no
+            if line_num:
+                numbers.append(line_num)
+                flags.append(ADDED if line.is_added else CONTEXT)
+                texts.append(line.value)
+        return lines
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def __iter__(self):
+        return zip(self.numbers, self.flags, self.texts)
+
+    @property
+    def start(self):
+        return self.numbers[0]
+
+    @property
+    def end(self):
+        return self.numbers[-1]
+
+    def added_lines(self):
+        return [line_num for line_num, flag in zip(self.numbers, self.flags) if flag]
+
+    def slice(self, start, end, owned_from=None):
+        """
+        Returns lines ``start`` to ``end`` (indexes, not line numbers). Added
+        lines before index ``owned_from`` become context.
+        """
+        flags = self.flags[start:end]
+        if owned_from is not None and owned_from > start:
+            untagged = min(owned_from, end) - start
+            flags[:untagged] = bytes(untagged)
+        return DiffLines(self.numbers[start:end], flags, self.texts[start:end])
+
+    def render(self):
+        """
+        Numbers every line and tags the added ones, as the review prompts
+        expect: ``"12: [CHANGED] code"``.
+        """
+        return "\n".join(
+            f"{line_num}: {'[CHANGED]' if flag else ''} {text.strip()}"
+            for line_num, flag, text in zip(self.numbers, self.flags, self.texts)
+        )
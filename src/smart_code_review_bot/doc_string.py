@@ -0,0 +1,485 @@
+import ast
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from .metrics import get_metrics, logger, span
+from .ollama_pool import get_pool
+from .packing import estimate_tokens
+from .stream_json import iter_json_objects
+import sys
+import difflib
+from . import git_diff
+from .generation_cache import GenerationCache
+from .config import REVIEW_CONFIG
+
+# Bump when the docstring prompts change, to invalidate cached docstrings.
+PROMPT_VERSION = 1
+
+
+class OllamaAPI:
+    def __init__(self, model="codegemma:7b-instruct", keep_alive=None, cache=None):
+        """
+        Summary: Initializes the model for the user.
+
+        Args:
+            model (object): The model object.
+            keep_alive (str, optional): How long Ollama keeps the model loaded.
+            cache (GenerationCache, optional): Cache of generated docstrings.
+
+        Returns:
+            None
+        """
+        self.pool = get_pool()
+        self.model = model
+        self.keep_alive = keep_alive
+        self.cache = cache
+
+    def _payload(self, prompt):
+        payload = {"model": self.model, "prompt": prompt, "stream": False}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+
+    def generate_docstring(self, code_snippet):
+        """
+        Generates a Python docstring for the given function code snippet.
+
+        Args:
+            code_snippet (str): The source code of the function for which the docstring is to be generated.
+
+        Returns:
+            str: The generated docstring content, formatted as plain text without any Python code or markdown.
+        """
+        prompt = f"""You are a docstring generator.
+                Your job is to generate ONLY the Python docstring content for the function below. 
+                DO NOT include the function definition or any Python code in the output.
+                DO NOT include:
+                - Any lines starting with 'def', 'return', or function logic
+                - Triple quotes or markdown formatting (e.g., ```python)
+                - Notes, examples, explanations, or indentation
+                ONLY return the raw docstring content like:
+                Summary line.
+                Args:
+                    param1 (type): description.
+                Returns:
+                    type: description.
+
+                Function:
+                {code_snippet}
+                """
+        return _clean_docstring(self._generate(prompt))
+
+    def _generate(self, prompt):
+        logger.debug("Prompt sent to ollama:\n%s", prompt)
+        with span("ollama_generation"):
+            response = self.pool.post(
+                "/api/generate", model=self.model, json=self._payload(prompt)
+            )
+        response.raise_for_status()
+        result = response.json()
+        get_metrics().record_generation(self.model, result)
+        logger.debug("Ollama response:\n%s", result.get("response", ""))
+        return result["response"]
+
+    def generate_docstring_batch(self, code_snippets):
+        """
+        Generates the docstrings of several functions with a single request.
+
+        Args:
+            code_snippets (list): Source code of each function.
+
+        Returns:
+            dict: Index into ``code_snippets`` to docstring, for the functions
+            the model answered for.
+        """
+        functions = "\n\n".join(
+            f"### Function {index}\n{snippet}"
+            for index, snippet in enumerate(code_snippets, start=1)
+        )
+        prompt = f"""You are a docstring generator.
+                Your job is to generate ONLY the Python docstring content for each numbered function below.
+                DO NOT include the function definition or any Python code in the docstrings.
+                DO NOT include:
+                - Any lines starting with 'def', 'return', or function logic
+                - Triple quotes or markdown formatting (e.g., ```python)
+                - Notes, examples, explanations, or indentation
+                Each docstring looks like:
+                Summary line.
+                Args:
+                    param1 (type): description.
+                Returns:
+                    type: description.
+
+                Return a single JSON object mapping each function number to its docstring, like:
+                {{"1": "Summary line.\\n\\nArgs:\\n    ...", "2": "..."}}
+
+                {functions}
+                """
+        answer = next(iter_json_objects([self._generate(prompt)]), None) or {}
+
+        docstrings = {}
+        for key, docstring in answer.items():
+            try:
+                index = int(key) - 1
+            except (TypeError, ValueError):
+                continue
+            if 0 <= index < len(code_snippets) and isinstance(docstring, str):
+                docstring = _clean_docstring(docstring)
+                if docstring:
+                    docstrings[index] = docstring
+        return docstrings
+
+    def cached_docstrings(self, targets):
+        """
+        Looks the targets up in the generation cache.
+
+        Returns:
+            dict: Index into ``targets`` to cached docstring.
+        """
+        if self.cache is None:
+            return {}
+        docstrings = {}
+        for i, target in enumerate(targets):
+            docstring = self.cache.get(target["cache_key"])
+            if docstring:
+                docstrings[i] = docstring
+        return docstrings
+
+    def batch_targets(self, targets, skip=()):
+        """
+        Groups targets into batches within the ``REVIEW_CONFIG["docstrings"]``
+        limits.
+
+        Args:
+            targets (list): Targets found by ``find_docstring_targets``.
+            skip (iterable): Indexes to leave out, e.g. cache hits.
+
+        Returns:
+            list: Lists of indexes into ``targets``, in order.
+        """
+        config = REVIEW_CONFIG.get("docstrings", {})
+        indexes = [i for i in range(len(targets)) if i not in skip]
+        return _batch(
+            indexes,
+            [estimate_tokens(targets[i]["body"]) for i in indexes],
+            config.get("maxBatchTokens", 2048),
+            config.get("batchSize", 8),
+        )
+
+    def generate_batch(self, targets, batch):
+        """
+        Generates the docstrings of ``targets[i] for i in batch`` with one
+        request, falling back to one request per function the answer misses.
+
+        Returns:
+            dict: Index into ``targets`` to docstring.
+        """
+        docstrings = {}
+        if len(batch) > 1:
+            try:
+                answer = self.generate_docstring_batch(
+                    [targets[i]["body"] for i in batch]
+                )
+                docstrings = {batch[i]: text for i, text in answer.items()}
+            except Exception as e:
+                print(f"⚠️ Batched docstring generation failed: {e}")
+        for i in batch:
+            if i in docstrings:
+                continue
+            try:
+                docstrings[i] = self.generate_docstring(targets[i]["body"])
+            except Exception as e:
+                print(f"❌ Failed for {targets[i]['name']}: {e}")
+
+        if self.cache is not None:
+            for i, docstring in docstrings.items():
+                if docstring:
+                    self.cache.put(targets[i]["cache_key"], docstring)
+        return docstrings
+
+    def generate_docstrings(self, targets, concurrency_limit=None):
+        """
+        Generates the docstrings of all ``targets`` of a file, one request per
+        batch, with batches running concurrently.
+
+        Args:
+            targets (list): Targets found by ``find_docstring_targets``.
+            concurrency_limit (int, optional): Batches generated in parallel.
+
+        Returns:
+            list: ``(target, docstring)`` pairs, in target order.
+        """
+        if concurrency_limit is None:
+            concurrency_limit = REVIEW_CONFIG.get("concurrencyLimit", 1)
+
+        docstrings = self.cached_docstrings(targets)
+        with ThreadPoolExecutor(max_workers=max(1, concurrency_limit)) as executor:
+            for result in executor.map(
+                lambda batch: self.generate_batch(targets, batch),
+                self.batch_targets(targets, skip=docstrings),
+            ):
+                docstrings.update(result)
+
+        return [
+            (target, docstrings[i])
+            for i, target in enumerate(targets)
+            if docstrings.get(i)
+        ]
+
+    def find_changed_lines(self, file_path, current_source, previous_file_path=None):
+        """
+        Summary:
+        Finds the lines of a file changed on this branch.
+
+        Compares with ``previous_file_path`` when given, otherwise asks git for
+        the changes since the merge-base with ``BASE_BRANCH``.
+
+        Args:
+            file_path (str): The path to the Python file.
+            current_source (str): Contents of the file.
+            previous_file_path (str, optional): The path to the previous version of the file.
+
+        Returns:
+            set: Changed line numbers, or None when they are unknown and every
+            function should be documented.
+        """
+        if not previous_file_path:
+            changed_lines = git_diff.changed_lines(file_path)
+            if changed_lines is None:
+                print(
+                    "⚠️ Could not get changes from git. Generating docstrings for all methods."
+                )
+            return changed_lines
+
+        with open(previous_file_path, "r") as prev_file:
+            previous_source = prev_file.read()
+        diff = difflib.unified_diff(
+            previous_source.splitlines(keepends=True),
+            current_source.splitlines(keepends=True),
+            n=0,
+            lineterm="",
+        )
+        return git_diff.parse_changed_lines("\n".join(diff))
+
+    def find_docstring_targets(
+        self,
+        file_path,
+        previous_file_path=None,
+        source=None,
+        tree=None,
+        changed_lines=None,
+    ):
+        """
+        Summary:
+        Finds the changed functions of a Python file that have no docstring yet.
+
+        Args:
+            file_path (str): The path to the Python file.
+            previous_file_path (str, optional): The path to the previous version of the file.
+            source (str, optional): Already read contents of the file.
+            tree (ast.Module, optional): Already parsed ``source``.
+            changed_lines (set, optional): Changed line numbers, when the
+                caller already knows them from the diff.
+
+        Returns:
+            tuple: The current source and a list of target dicts with ``name``,
+            ``lineno``, ``insert_at`` (0-based line the docstring goes before),
+            ``indent``, ``body`` and ``cache_key`` keys in line order, or None if the file is
+            skipped.
+        """
+        max_file_size = REVIEW_CONFIG.get("maxFileSize")
+        if max_file_size and os.path.getsize(file_path) > max_file_size:
+            print(f"⚠️ Skipping {file_path}: larger than maxFileSize")
+            return None
+
+        if source is None:
+            with open(file_path, "r") as file:
+                source = file.read()
+        current_source = source
+
+        if changed_lines is None:
+            changed_lines = self.find_changed_lines(
+                file_path, current_source, previous_file_path
+            )
+
+        if tree is None:
+            tree = ast.parse(current_source)
+        lines = current_source.splitlines()
+        targets = []
+
+        functions = sorted(
+            (
+                node
+                for node in ast.walk(tree)
+                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+            ),
+            key=lambda node: node.lineno,
+        )
+        for node in functions:
+            if ast.get_docstring(node) is not None or not node.body:
+                continue
+            # Skip functions whose definition and body are unchanged
+            first_line = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            if changed_lines is not None and changed_lines.isdisjoint(
+                range(first_line, node.end_lineno + 1)
+            ):
+                continue
+
+            first_statement = node.body[0]
+            if first_statement.lineno == node.lineno:
+                continue  # One-line function, no room for a docstring
+
+            # The docstring goes right above the first statement, which also
+            # handles signatures spanning several lines. A decorated nested
+            # function or class starts at its first decorator.
+            statement_start = min(
+                [first_statement.lineno]
+                + [d.lineno for d in getattr(first_statement, "decorator_list", [])]
+            )
+            indent = " " * first_statement.col_offset
+            def_indent = node.col_offset
+            function_source = "\n".join(
+                line[def_indent:] for line in lines[node.lineno - 1 : node.end_lineno]
+            )
+            targets.append(
+                {
+                    "name": node.name,
+                    "lineno": node.lineno,
+                    "insert_at": statement_start - 1,
+                    "indent": indent,
+                    "body": function_source,
+                    "cache_key": (
+                        GenerationCache.make_key(
+                            "docstring", self.model, PROMPT_VERSION, node
+                        )
+                        if self.cache is not None
+                        else None
+                    ),
+                }
+            )
+
+        return current_source, targets
+
+    def insert_docstrings(self, file_path, current_source, docstrings):
+        """
+        Summary:
+        Inserts generated docstrings below their function definitions and writes the file.
+
+        All insertions are spliced in a single pass in line order, and the
+        file is replaced atomically so an interrupted run never leaves it
+        half written.
+
+        Args:
+            file_path (str): The path to the Python file.
+            current_source (str): The source the targets were found in.
+            docstrings (list): ``(target, docstring)`` pairs, in any order.
+
+        Returns:
+            None
+        """
+        if not docstrings:
+            return
+
+        source_lines = current_source.splitlines(keepends=True)
+        new_lines = []
+        position = 0
+
+        for target, docstring in sorted(docstrings, key=lambda d: d[0]["insert_at"]):
+            indent = target["indent"]
+
+            # Clean and prepare docstring lines
+            cleaned = docstring.strip().strip('"""').strip("'''").strip()
+            cleaned = cleaned.replace('"""', '\\"\\"\\"')
+            docstring_lines = [f'{indent}"""']
+            for line in cleaned.splitlines():
+                docstring_lines.append(f"{indent}{line}".rstrip())
+            docstring_lines.append(f'{indent}"""')
+
+            new_lines.extend(source_lines[position : target["insert_at"]])
+            new_lines.extend(line + "\n" for line in docstring_lines)
+            position = target["insert_at"]
+        new_lines.extend(source_lines[position:])
+
+        try:
+            ast.parse("".join(new_lines))
+        except SyntaxError as e:
+            print(f"⚠️ Not writing {file_path}: docstrings would break it ({e})")
+            return
+
+        directory = os.path.dirname(os.path.abspath(file_path))
+        with tempfile.NamedTemporaryFile(
+            "w", dir=directory, suffix=".tmp", delete=False
+        ) as file:
+            file.writelines(new_lines)
+        shutil.copymode(file_path, file.name)
+        os.replace(file.name, file_path)
+
+        print(f"✅ Docstrings added in: {file_path}")
+
+    def add_docstrings_to_file(self, file_path, previous_file_path=None):
+        """
+        Summary:
+        Generates docstrings for functions in a Python file based on the changes between the current and previous versions of the file.
+
+        Args:
+            file_path (str): The path to the Python file.
+            previous_file_path (str, optional): The path to the previous version of the file.
+
+        Returns:
+            None
+        """
+        print(f"📝 Running docstring generator on {file_path}")
+
+        found = self.find_docstring_targets(file_path, previous_file_path)
+        if found is None:
+            return
+        current_source, targets = found
+
+        if not targets:
+            return
+
+        print(f"🔍 Generating docstrings for: {', '.join(t['name'] for t in targets)}")
+        docstrings = self.generate_docstrings(targets)
+        self.insert_docstrings(file_path, current_source, docstrings)
+
+
+def _clean_docstring(text):
+    return text.strip().replace("```python", "").replace("```", "").strip()
+
+
+def _batch(items, sizes, max_tokens, max_items):
+    # Greedy, in order: a new batch starts when the next item would not fit.
+    batches = []
+    current = []
+    current_tokens = 0
+    for item, size in zip(items, sizes):
+        if current and (
+            current_tokens + size > max_tokens or len(current) >= max_items
+        ):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(item)
+        current_tokens += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(
+            "Usage: python -m smart_code_review_bot.doc_string <file.py> [<previous_file.py>]"
+        )
+        sys.exit(1)
+
+    file_path = sys.argv[1]
+    previous_file = sys.argv[2] if len(sys.argv) > 2 else None
+    cache = GenerationCache.from_config()
+    ollama = OllamaAPI(cache=cache)
+    try:
+        ollama.add_docstrings_to_file(file_path, previous_file_path=previous_file)
+    finally:
+        if cache is not None:
+            cache.close()
@@ -0,0 +1,199 @@
+import fnmatch
+import os
+import subprocess
+import threading
+
+from . import git_diff
+
+_source = None
+_source_lock = threading.Lock()
+
+
+class LocalFiles:
+    """
+    Files of the checked out working tree; the base side of a change and
+    the diff itself come from git.
+    """
+
+    local = True
+    _merge_base = None
+
+    def head_sha(self):
+        return (
+            subprocess.check_output(["git", "rev-parse", "HEAD"])
+            .decode("utf-8")
+            .strip()
+        )
+
+    def iter_diff(self, paths=(), diff_filter=None, pathspecs=()):
+        return git_diff.iter_diff(
+            paths=paths, diff_filter=diff_filter, pathspecs=pathspecs
+        )
+
+    def read(self, path, limit=-1):
+        try:
+            with open(path, "r", errors="replace") as f:
+                return f.read(limit)
+        except OSError:
+            return None
+
+    def read_base(self, path):
+        # The fork point, as for the diff, not the tip of the base branch.
+        if self._merge_base is None:
+            self._merge_base = git_diff.merge_base()
+        return git_diff.show_file(path, self._merge_base)
+
+    def size(self, path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return None
+
+
+class GitHubFiles(LocalFiles):
+    """
+    Files of a pull request read through the GitHub API, for runs without a
+    checkout.
+
+    The unified diff comes from the pull request endpoint, or from the
+    per-file patches of the files endpoint when GitHub refuses to render it,
+    and is filtered here the way git would filter it. File contents come
+    from the contents API at the head or base commit of the pull request,
+    fetched only when a stage asks for them and at most once per run.
+    """
+
+    local = False
+
+    def __init__(self, github, owner, repo, pr_number):
+        self.github = github
+        self.owner = owner
+        self.repo = repo
+        self.pr_number = pr_number
+        pull = github.get_pull_request(owner, repo, pr_number)
+        self.head = pull["head"]["sha"]
+        self.base = pull["base"]["sha"]
+        self._blobs = {}
+        self._lock = threading.Lock()
+
+    def head_sha(self):
+        return self.head
+
+    def iter_diff(self, paths=(), diff_filter=None, pathspecs=()):
+        try:
+            diff = self.github.get_pull_request_diff(
+                self.owner, self.repo, self.pr_number
+            )
+            lines = diff.splitlines(True)
+        except Exception as e:
+            # GitHub answers 406 when the diff of a large pull request is too
+            # big to render.
+            print(
+                f"⚠️ Could not fetch the pull request diff ({e}), reading it per file"
+            )
+            lines = self._iter_file_patches()
+        paths = set(paths)
+        pathspecs = list(pathspecs)
+        for file in git_diff.iter_patched_files(lines):
+            if paths:
+                if file.path not in paths:
+                    continue
+            elif pathspecs and not any(
+                fnmatch.fnmatch(file.path, spec) for spec in pathspecs
+            ):
+                continue
+            if diff_filter and not _passes_filter(file, diff_filter):
+                continue
+            yield file
+
+    def _iter_file_patches(self):
+        files = self.github.iter_pull_request_files(
+            self.owner, self.repo, self.pr_number
+        )
+        for entry in files:
+            yield from _file_diff(entry)
+
+    def read(self, path, limit=-1):
+        text = self._blob(path, self.head)
+        if text is None or limit < 0:
+            return text
+        return text[:limit]
+
+    def read_base(self, path):
+        return self._blob(path, self.base)
+
+    def size(self, path):
+        # Unknown without downloading the file.
+        return None
+
+    def _blob(self, path, ref):
+        with self._lock:
+            if (path, ref) in self._blobs:
+                return self._blobs[(path, ref)]
+        try:
+            text = self.github.get_file_contents(self.owner, self.repo, path, ref)
+        except Exception as e:
+            print(f"⚠️ Could not fetch {path}@{ref[:12]}: {e}")
+            text = None
+        with self._lock:
+            self._blobs[(path, ref)] = text
+        return text
+
+
+def _file_diff(entry):
+    """
+    Returns the unified diff lines of one entry of the pull request files
+    endpoint. Binary files and files too large for GitHub to include a
+    ``patch`` have no hunks and are left out.
+    """
+    patch = entry.get("patch")
+    if not patch:
+        return []
+    path = entry["filename"]
+    previous = entry.get("previous_filename") or path
+    source, target = f"a/{previous}", f"b/{path}"
+    lines = [f"{git_diff.FILE_HEADER}{source} {target}\n"]
+    # The mode lines are how a git header says the file was added or removed.
+    if entry.get("status") == "added":
+        source = "/dev/null"
+        lines.append("new file mode 100644\n")
+    elif entry.get("status") == "removed":
+        target = "/dev/null"
+        lines.append("deleted file mode 100644\n")
+    lines.extend([f"--- {source}\n", f"+++ {target}\n"])
+    lines.extend(line + "\n" for line in patch.splitlines())
+    return lines
+
+
+def _passes_filter(file, diff_filter):
+    # Same letters as git's --diff-filter for the statuses unidiff knows:
+    # upper case selects, lower case excludes.
+    if file.is_added_file:
+        status = "A"
+    elif file.is_removed_file:
+        status = "D"
+    elif file.is_rename:
+        status = "R"
+    else:
+        status = "M"
+    selected = [letter for letter in diff_filter if letter.isupper()]
+    if selected and status not in selected:
+        return False
+    return status.lower() not in diff_filter
+
+
+def get_source():
+    global _source
+    with _source_lock:
+        if _source is None:
+            _source = LocalFiles()
+        return _source
+
+
+def set_source(source):
+    """
+    Makes every stage read files from ``source``, e.g. ``GitHubFiles`` for
+    runs without a checkout.
+    """
+    global _source
+    with _source_lock:
+        _source = source
@@ -0,0 +1,61 @@
+import ast
+import copy
+import hashlib
+
+from .sqlite_cache import SQLiteCache
+
+
+def function_fingerprint(node):
+    """
+    Dumps a function's AST without positions or its own docstring, so moving,
+    reformatting or re-documenting it keeps the same fingerprint.
+
+    Args:
+        node (ast.FunctionDef | ast.AsyncFunctionDef): The function.
+
+    Returns:
+        str: The normalized dump.
+    """
+    if ast.get_docstring(node) is not None:
+        node = copy.copy(node)
+        node.body = node.body[1:]
+    return ast.dump(node, annotate_fields=False, include_attributes=False)
+
+
+class GenerationCache(SQLiteCache):
+    """
+    On-disk SQLite cache of generated docstrings and unit tests.
+
+    Entries are keyed by a hash of the kind of output, the model, the prompt
+    version and the function fingerprint, and evicted least recently used
+    first once the cache exceeds ``max_entries`` or ``max_bytes``.
+    """
+
+    filename = "generations.sqlite3"
+    table = "generations"
+    columns = """
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        last_used_at REAL NOT NULL
+    """
+    config_section = "generationCache"
+    label = "Generation cache"
+
+    def __init__(self, directory, max_entries=5000, max_bytes=20_000_000):
+        super().__init__(directory, max_entries, max_bytes)
+
+    @staticmethod
+    def make_key(kind, model, prompt_version, node):
+        digest = hashlib.sha256()
+        for part in (kind, model, str(prompt_version), function_fingerprint(node)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key):
+        row = self._lookup(key, "value")
+        return row[0] if row is not None else None
+
+    def put(self, key, value):
+        self._store(key, len(value), value=value)
@@ -0,0 +1,258 @@
+import ast
+import io
+import os
+import re
+import subprocess
+
+from unidiff import PatchSet
+
+from .metrics import span
+
+# Import config
+from .config import REVIEW_CONFIG
+
+BASE_BRANCH = os.getenv("BASE_BRANCH", "origin/master")
+
+HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+FILE_HEADER = "diff --git "
+# Matches the usual ``supportedExtensions`` form, e.g. ``.(js|ts|py)$``.
+EXTENSION_ALTERNATION = re.compile(r"\(((?:\w+\|)*\w+)\)\$?$")
+
+
+def merge_base(base=None):
+    """
+    Returns the commit the current branch forked from ``base``, falling back
+    to ``base`` itself when git cannot tell (e.g. in a shallow clone).
+    """
+    base = base or BASE_BRANCH
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "merge-base", base, "HEAD"], stderr=subprocess.DEVNULL
+            )
+            .decode("utf-8")
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return base
+
+
+def parse_changed_lines(diff_text):
+    """
+    Collects the new-side line numbers touched by a ``git diff -U0``.
+
+    Args:
+        diff_text (str): Diff of a single file, without context lines.
+
+    Returns:
+        set: 1-based line numbers that were added or changed.
+    """
+    changed = set()
+    for line in diff_text.splitlines():
+        match = HUNK_HEADER.match(line)
+        if match:
+            start = int(match.group(1))
+            length = int(match.group(2)) if match.group(2) is not None else 1
+            changed.update(range(start, start + length))
+    return changed
+
+
+def changed_lines(file_path, base=None):
+    """
+    Asks git which lines of ``file_path`` changed since the merge-base with
+    ``base``.
+
+    Args:
+        file_path (str): Path of the file, relative to the repository root
+            or absolute.
+        base (str, optional): Branch to compare with. Defaults to the
+            ``BASE_BRANCH`` environment variable.
+
+    Returns:
+        set: Changed line numbers; every line of a file added since the
+        base. None when git could not be asked.
+    """
+    commit = merge_base(base)
+    try:
+        tracked = subprocess.run(
+            ["git", "ls-files", "--error-unmatch", "--", file_path],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        if tracked.returncode != 0:
+            # Untracked files are new in their entirety.
+            with open(file_path, "r") as f:
+                return set(range(1, sum(1 for _ in f) + 1))
+        diff_text = subprocess.check_output(
+            ["git", "diff", "-U0", "--no-color", commit, "--", file_path],
+            stderr=subprocess.DEVNULL,
+        ).decode("utf-8", errors="replace")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return parse_changed_lines(diff_text)
+
+
+def show_file(path, rev=None):
+    """
+    Returns the contents of ``path`` at ``rev`` (default ``BASE_BRANCH``),
+    or None when git does not have it there.
+    """
+    try:
+        return subprocess.check_output(
+            ["git", "show", f"{rev or BASE_BRANCH}:{path}"], stderr=subprocess.DEVNULL
+        ).decode("utf-8", errors="replace")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def extension_pathspecs(pattern):
+    """
+    Turns a ``supportedExtensions`` regular expression into git pathspecs,
+    e.g. ``.(js|py)$`` into ``["*.js", "*.py"]``. Returns an empty list,
+    i.e. no restriction, for patterns of any other form.
+    """
+    match = EXTENSION_ALTERNATION.search(pattern or "")
+    if not match:
+        return []
+    return [f"*.{extension}" for extension in match.group(1).split("|")]
+
+
+def iter_diff(base=None, paths=(), diff_filter=None, pathspecs=()):
+    """
+    Streams ``git diff`` of ``HEAD`` against its merge-base with ``base``
+    through a pipe and yields each patched file as soon as its part of the
+    diff has been read, so only one file is held in memory at a time. Like
+    the pull request diff, it leaves out changes made only on ``base``.
+
+    Args:
+        base (str, optional): Branch to compare with. Defaults to the
+            ``BASE_BRANCH`` environment variable.
+        paths (iterable): Restrict the diff to these files when not empty.
+        diff_filter (str, optional): Passed to ``--diff-filter``, e.g.
+            ``"d"`` to leave out deleted files.
+        pathspecs (iterable): Further git pathspecs, used when ``paths`` is
+            empty, e.g. from ``extension_pathspecs``.
+
+    Yields:
+        PatchedFile: The files of the diff, in git's order.
+    """
+    command = ["git", "diff", "--no-color", "--no-ext-diff", "--find-renames"]
+    if diff_filter:
+        command.append(f"--diff-filter={diff_filter}")
+    command += [merge_base(base), "HEAD"]
+    pathspecs = list(paths) or list(pathspecs)
+    if pathspecs:
+        command += ["--"] + pathspecs
+
+    process = subprocess.Popen(command, stdout=subprocess.PIPE)
+    try:
+        # newline="" keeps CRLF endings, which unidiff reports as content.
+        yield from iter_patched_files(
+            io.TextIOWrapper(
+                process.stdout, encoding="utf-8", errors="replace", newline=""
+            )
+        )
+    finally:
+        process.stdout.close()
+        returncode = process.wait()
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, command)
+
+
+def iter_patched_files(lines):
+    """
+    Parses a unified diff one file at a time.
+
+    Args:
+        lines (iterable): Lines of the diff, with their line endings.
+
+    Yields:
+        PatchedFile: Each file as soon as its last line has been read.
+    """
+    chunk = []
+    for line in lines:
+        if line.startswith(FILE_HEADER) and chunk:
+            yield from _parse_chunk(chunk)
+            chunk = []
+        chunk.append(line)
+    if chunk:
+        yield from _parse_chunk(chunk)
+
+
+def _parse_chunk(chunk):
+    with span("diff_parse"):
+        files = PatchSet(chunk)
+    return files
+
+
+def _read_local(path):
+    if not os.path.isfile(path):
+        return None
+    with open(path, "r") as f:
+        return f.read()
+
+
+def load_sources(files, paths=(), read=None):
+    """
+    Reads and parses every changed Python file once for the AST based stages.
+
+    Args:
+        files (iterable): Patched files of the pull request.
+        paths (iterable): Restrict to these files when not empty.
+        read (callable, optional): ``read(path)`` returns the new contents of
+            a file or None, e.g. ``file_source.get_source().read``. Defaults
+            to reading the working tree.
+
+    Returns:
+        dict: Path to ``{"source", "tree", "added_lines", "is_new"}``.
+    """
+    sources = {}
+    for _ in collect_sources(files, sources, paths, read):
+        pass
+    return sources
+
+
+def collect_sources(files, sources, paths=(), read=None):
+    """
+    Passes ``files`` through, parsing each changed Python file into
+    ``sources`` as ``load_sources`` does, so a streamed diff can feed the
+    review stage and the AST based stages in one pass.
+    """
+    paths = set(paths)
+    max_file_size = REVIEW_CONFIG.get("maxFileSize")
+
+    for file in files:
+        if (
+            file.path.endswith(".py")
+            and not file.is_removed_file
+            and (not paths or file.path in paths)
+        ):
+            parsed = _parse_source(file, read or _read_local, max_file_size)
+            if parsed is not None:
+                sources[file.path] = parsed
+        yield file
+
+
+def _parse_source(file, read, max_file_size):
+    source = read(file.path)
+    if source is None:
+        return None
+    if max_file_size and len(source.encode("utf-8")) > max_file_size:
+        print(f"⚠️ Skipping {file.path}: larger than maxFileSize")
+        return None
+
+    try:
+        with span("ast_parse"):
+            tree = ast.parse(source)
+    except SyntaxError as e:
+        print(f"⚠️ Skipping {file.path}: {e}")
+        return None
+
+    return {
+        "source": source,
+        "tree": tree,
+        "added_lines": [
+            line.target_line_no for hunk in file for line in hunk if line.is_added
+        ],
+        "is_new": file.is_added_file,
+    }
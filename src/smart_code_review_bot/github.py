@@ -0,0 +1,418 @@
+import json
+import os
+from urllib.parse import quote
+
+import requests
+from .github_cache import get_conditional_cache
+from .http_client import get_client
+from .metrics import span
+
+# A GitHub Actions token cannot read /user; its comments are posted as this.
+DEFAULT_BOT_LOGIN = "github-actions[bot]"
+_logins = {}
+
+
+class GitHubAPI:
+    def __init__(self, token):
+        """
+        **Docstring:**
+
+
+        # Get GitHub repository information
+        def get_repo_info(self):
+            \"\"\"
+            Gets GitHub repository information.
+
+            Args:
+                self: The object instance.
+
+            Returns:
+                dict: GitHub repository information.
+        """
+        self.token = token
+        # GitHub Actions sets GITHUB_API_URL, e.g. for GitHub Enterprise Server
+        self.base_url = os.getenv("GITHUB_API_URL", "https://api.github.com")
+        self.headers = {
+            "Authorization": f"Bearer {self.token}",
+            "User-Agent": "Ollama-Code-Review-Bot",
+            "Accept": "application/vnd.github.v3+json",
+        }
+        self.http = get_client("github")
+        self.cache = get_conditional_cache()
+
+    def make_request(self, method, path, data=None, additional_headers=None):
+        """
+        ## Summary
+
+        Sends a request to the GitHub API using the specified HTTP method.
+
+        ## Args:
+
+        - `method` (str): HTTP method to use (e.g., "GET", "POST", "PATCH").
+        - `url` (str): GitHub API endpoint.
+        - `additional_headers` (dict): Additional headers to include in the request.
+        - `data` (dict): Data to send in the request body (only used for POST, PATCH methods).
+
+        ## Returns:
+
+        - dict: Parsed JSON response if successful.
+        - str: Text response if successful (if unable to parse JSON).
+        - Exception: In case of request errors or GitHub API errors.
+        """
+        if method == "GET":
+            return self.get(path, additional_headers)[0]
+
+        url = f"{self.base_url}{path}"
+        headers = self.headers.copy()
+        if additional_headers:
+            headers.update(additional_headers)
+
+        try:
+            with span("github"):
+                if method == "POST":
+                    response = self.http.post(url, headers=headers, json=data)
+                elif method == "PATCH":
+                    response = self.http.patch(url, headers=headers, json=data)
+                else:
+                    raise ValueError(f"Unsupported HTTP method: {method}")
+
+            if response.status_code >= 200 and response.status_code < 300:
+                try:
+                    return response.json()
+                except ValueError:
+                    return response.text
+            else:
+                raise Exception(
+                    f"GitHub API request failed: {response.status_code} - {response.text}"
+                )
+        except requests.RequestException as e:
+            raise Exception(f"Error making request to GitHub API: {e}")
+
+    def get(self, path, additional_headers=None, parse_json=True):
+        """
+        Sends a conditional GET request to the GitHub API.
+
+        A cached ``ETag`` or ``Last-Modified`` of the same URL is sent along,
+        and the cached body is returned when GitHub answers 304 Not Modified.
+
+        Args:
+            path (str): API path, or a full URL such as a ``Link`` header's.
+            additional_headers (dict): Additional headers to include in the request.
+            parse_json (bool): Whether to parse the body as JSON.
+
+        Returns:
+            tuple: ``(body, links)`` where ``body`` is the parsed JSON (or the
+            text when it is not JSON or ``parse_json`` is False) and ``links`` maps ``Link`` header
+            relations such as ``"next"`` to URLs.
+        """
+        url = path if path.startswith("http") else f"{self.base_url}{path}"
+        headers = self.headers.copy()
+        if additional_headers:
+            headers.update(additional_headers)
+
+        key = cached = None
+        if self.cache is not None:
+            key = self.cache.make_key(url, headers)
+            cached = self.cache.get(key)
+        if cached is not None:
+            etag, last_modified, _, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        try:
+            with span("github"):
+                response = self.http.get(url, headers=headers)
+        except requests.RequestException as e:
+            raise Exception(f"Error making request to GitHub API: {e}")
+
+        if response.status_code == 304 and cached is not None:
+            self.cache.touch(key)
+            text, links = cached[2], cached[3]
+        elif response.status_code >= 200 and response.status_code < 300:
+            text = response.text
+            links = {
+                rel: link["url"]
+                for rel, link in response.links.items()
+                if "url" in link
+            }
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if key is not None and (etag or last_modified):
+                self.cache.put(key, etag, last_modified, text, links)
+        else:
+            raise Exception(
+                f"GitHub API request failed: {response.status_code} - {response.text}"
+            )
+
+        if not parse_json:
+            return text, links
+        try:
+            return json.loads(text), links
+        except ValueError:
+            return text, links
+
+    def iter_pages(self, path, per_page=100):
+        """
+        Yields the items of a GitHub list endpoint, following the ``Link``
+        header from page to page.
+
+        Args:
+            path (str): The API endpoint to request.
+            per_page (int): Page size, at most 100.
+
+        Yields:
+            dict: Each item, in API order.
+        """
+        separator = "&" if "?" in path else "?"
+        url = f"{path}{separator}per_page={per_page}"
+        while url:
+            items, links = self.get(url)
+            yield from items
+            url = links.get("next")
+
+    def get_login(self):
+        """
+        Returns the login the token posts as, so the bot can tell its own
+        comments from look-alikes posted by anyone else. ``REVIEW_BOT_LOGIN``
+        overrides it.
+        """
+        login = os.getenv("REVIEW_BOT_LOGIN")
+        if login:
+            return login
+        if self.token not in _logins:
+            try:
+                _logins[self.token] = self.get("/user")[0]["login"]
+            except Exception:
+                _logins[self.token] = DEFAULT_BOT_LOGIN
+        return _logins[self.token]
+
+    def is_own_comment(self, comment):
+        return (comment.get("user") or {}).get("login") == self.get_login()
+
+    def get_pull_request(self, owner, repo, pr_number):
+        """
+        ## GET Request Function
+
+        Returns the result of a GET request to the specified path.
+
+        Args:
+            path (str): The path to send the request to.
+
+        Returns:
+            dict: The JSON response from the server.
+        """
+        path = f"/repos/{owner}/{repo}/pulls/{pr_number}"
+        return self.make_request("GET", path)
+
+    def create_review_comment(
+        self, owner, repo, pr_number, commit_id, path, position, body
+    ):
+        """
+        Summary line.
+
+        Args:
+            path (str): Path to the file for the inline comment.
+            position (int): Position within the file for the inline comment.
+
+        Returns:
+            dict or None: Response object or None if an error occurred.
+        """
+        try:
+            if not path or position is None:
+                raise ValueError("Invalid path or position for inline comment.")
+
+            review_path = f"/repos/{owner}/{repo}/pulls/{pr_number}/comments"
+            return self.make_request(
+                "POST",
+                review_path,
+                {
+                    "body": body,
+                    "commit_id": commit_id,
+                    "path": path,
+                    "position": position,
+                    "side": "RIGHT",
+                },
+            )
+        except ValueError as ve:
+            print(f"Skipping invalid inline comment: {ve}")
+            return None
+        except Exception as error:
+            print(f"Error creating review comment: {error}")
+            raise error
+
+    def post_comment(self, owner, repo, pr_number, body):
+        """
+        ## Summary
+
+        Send a POST request to the specified path with the given body.
+
+        ## Args
+
+        - path (str): The path to send the request to.
+        - body (dict): The body of the request.
+
+        ## Returns
+
+        - dict: The response from the server.
+        """
+        path = f"/repos/{owner}/{repo}/issues/{pr_number}/comments"
+        return self.make_request("POST", path, {"body": body})
+
+    def create_review(self, owner, repo, pr_number, comments, body):
+        """
+        Summary line.
+
+        Args:
+            path (str): path.
+            body (str): body.
+            comments (str): comments.
+
+        Returns:
+            str: request.
+        """
+        path = f"/repos/{owner}/{repo}/pulls/{pr_number}/reviews"
+        return self.make_request(
+            "POST",
+            path,
+            {
+                "body": body,
+                "event": "COMMENT",
+                "comments": comments,
+            },
+        )
+
+    def get_pull_request_diff(self, owner, repo, pr_number):
+        """
+        Summary: Makes a GET request to the GitHub API endpoint.
+
+        Args:
+            path (str): The path to the GitHub API endpoint.
+
+        Returns:
+            dict: The response from the GitHub API.
+        """
+        path = f"/repos/{owner}/{repo}/pulls/{pr_number}"
+        additional_headers = {"Accept": "application/vnd.github.v3.diff"}
+        return self.get(path, additional_headers, parse_json=False)[0]
+
+    def iter_pull_request_files(self, owner, repo, pr_number):
+        """
+        Yields the changed files of a pull request, each with its ``patch``,
+        from the paginated files endpoint. GitHub serves it for pull requests
+        whose diff is too large for the diff media type, up to 3000 files.
+
+        Args:
+            owner (str): The owner of the repository.
+            repo (str): The name of the repository.
+            pr_number (int): The pull request number.
+
+        Yields:
+            dict: Each file as returned by the GitHub API.
+        """
+        path = f"/repos/{owner}/{repo}/pulls/{pr_number}/files"
+        yield from self.iter_pages(path)
+
+    def get_file_contents(self, owner, repo, path, ref):
+        """
+        Returns the raw contents of ``path`` at commit ``ref`` through the
+        contents API, without a checkout.
+
+        Args:
+            path (str): Path of the file in the repository.
+            ref (str): Commit SHA, branch or tag.
+
+        Returns:
+            str: The file contents.
+        """
+        api_path = f"/repos/{owner}/{repo}/contents/{quote(path)}?ref={quote(ref)}"
+        additional_headers = {"Accept": "application/vnd.github.raw"}
+        return self.get(api_path, additional_headers, parse_json=False)[0]
+
+    def update_review_comment(self, owner, repo, comment_id, body):
+        """
+        ## Summary: Send a PATCH request to the specified path with the given body.
+
+        ## Args:
+            path (str): The path to send the request to.
+            body (dict): The body of the request.
+
+        ## Returns:
+            dict: The response from the server.
+        """
+        path = f"/repos/{owner}/{repo}/pulls/comments/{comment_id}"
+        return self.make_request("PATCH", path, {"body": body})
+
+    def get_existing_comments(self, owner, repo, pr_number):
+        """
+        ## Summary line.
+
+        ## Args:
+            path (str): The API endpoint to request.
+
+        ## Returns:
+            list: Every review comment of the pull request.
+        """
+        path = f"/repos/{owner}/{repo}/pulls/{pr_number}/comments"
+        return list(self.iter_pages(path))
+
+    def get_issue_comments(self, owner, repo, pr_number):
+        """
+        Fetches the general (issue) comments of a pull request.
+
+        Args:
+            owner (str): The owner of the repository.
+            repo (str): The name of the repository.
+            pr_number (int): The pull request number.
+
+        Returns:
+            list: The comments returned by the GitHub API.
+        """
+        path = f"/repos/{owner}/{repo}/issues/{pr_number}/comments"
+        return list(self.iter_pages(path))
+
+    def update_issue_comment(self, owner, repo, comment_id, body):
+        """
+        Replaces the body of a general (issue) comment.
+
+        Args:
+            owner (str): The owner of the repository.
+            repo (str): The name of the repository.
+            comment_id (int): The id of the comment to update.
+            body (str): The new comment body.
+
+        Returns:
+            dict: The response from the GitHub API.
+        """
+        path = f"/repos/{owner}/{repo}/issues/comments/{comment_id}"
+        return self.make_request("PATCH", path, {"body": body})
+
+    def genaral_comment_to_pr(self, repo_owner, repo_name, pr_number, comment_body):
+        """
+        Posts a comment on the specified pull request.
+
+        Args:
+            repo_owner (str): The owner of the repository.
+            repo_name (str): The name of the repository.
+            pr_number (int): The pull request number.
+            comment_body (str): The content of the comment.
+
+        Returns:
+            dict: The response from the GitHub API.
+        """
+        if not comment_body.strip():
+            print("Comment body is empty. Skipping posting the comment.")
+            return
+
+        url = f"{self.base_url}/repos/{repo_owner}/{repo_name}/issues/{pr_number}/comments"
+        data = {"body": comment_body}
+
+        with span("github"):
+            response = self.http.post(url, headers=self.headers, json=data)
+        if response.status_code != 201:
+            raise Exception(
+                f"Failed to post comment: {response.status_code} - {response.text}"
+            )
+        print("Comment posted successfully.")
+        return response.json()
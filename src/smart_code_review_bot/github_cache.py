@@ -0,0 +1,83 @@
+import hashlib
+import json
+import threading
+
+from .sqlite_cache import SQLiteCache
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class ConditionalCache(SQLiteCache):
+    """
+    On-disk SQLite cache of GitHub GET responses and their validators.
+
+    A cached ``ETag`` or ``Last-Modified`` is replayed as ``If-None-Match``
+    or ``If-Modified-Since``; GitHub answers an unchanged resource with a
+    304, which does not count against the primary rate limit, and the
+    stored body is served instead.
+    """
+
+    filename = "github.sqlite3"
+    table = "responses"
+    columns = """
+        key TEXT PRIMARY KEY,
+        etag TEXT,
+        last_modified TEXT,
+        body TEXT NOT NULL,
+        links TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        last_used_at REAL NOT NULL
+    """
+    config_section = "githubCache"
+    label = "GitHub response cache"
+
+    def __init__(self, directory, max_entries=1000, max_bytes=50_000_000):
+        super().__init__(directory, max_entries, max_bytes)
+        self.evict()
+
+    @staticmethod
+    def make_key(url, headers):
+        # The token is left out: GitHub Actions mints a new one for every
+        # job, so entries keyed on it would never match on a later run. The
+        # stored body is only served when GitHub answers 304 to the current
+        # token, so it still decides who may read the resource.
+        digest = hashlib.sha256()
+        for part in (url, headers.get("Accept", "")):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Returns ``(etag, last_modified, body, links)`` for ``key``, or None.
+
+        Only a 304 answer counts as a hit, see ``touch``.
+        """
+        row = self._row(key, "etag, last_modified, body, links")
+        if row is None:
+            return None
+        return row[0], row[1], row[2], json.loads(row[3])
+
+    def put(self, key, etag, last_modified, body, links):
+        self._store(
+            key,
+            len(body),
+            etag=etag,
+            last_modified=last_modified,
+            body=body,
+            links=json.dumps(links),
+        )
+        with self._lock:
+            self.misses += 1
+
+
+def get_conditional_cache():
+    """
+    Returns the shared GitHub response cache, or None when it is disabled.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ConditionalCache.from_config() or False
+        return _cache or None
@@ -0,0 +1,209 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Import config
+from .config import REVIEW_CONFIG
+
+RETRY_STATUS_CODES = {500, 502, 503, 504}
+IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "PATCH", "DELETE")
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+class HttpClient:
+    """
+    Keep-alive HTTP client with timeouts and retries.
+
+    Connections are pooled on a single ``requests.Session``. Failed calls are
+    retried with exponential backoff and jitter; rate limited responses wait
+    for ``Retry-After`` or ``X-RateLimit-Reset`` instead.
+    """
+
+    def __init__(
+        self,
+        connect_timeout=10,
+        read_timeout=30,
+        max_retries=3,
+        backoff_factor=1.0,
+        max_backoff=30,
+        rate_limit_max_wait=120,
+        pool_maxsize=10,
+        retry_methods=IDEMPOTENT_METHODS,
+        retry_read_timeouts=True,
+    ):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.rate_limit_max_wait = rate_limit_max_wait
+        self.retry_methods = {method.upper() for method in retry_methods}
+        self.retry_read_timeouts = retry_read_timeouts
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method, url, deadline=None, **kwargs):
+        """
+        Sends a request, retrying as described above. ``deadline``, a
+        ``time.monotonic()`` value, caps the timeouts of every attempt and
+        stops retrying once it would be passed.
+        """
+        method = method.upper()
+        timeout = kwargs.pop("timeout", self.timeout)
+        attempt = 0
+
+        while True:
+            kwargs["timeout"] = timeout
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise requests.Timeout(f"{method} {url}: deadline has passed")
+                kwargs["timeout"] = (
+                    tuple(min(part, remaining) for part in timeout)
+                    if isinstance(timeout, tuple)
+                    else min(timeout, remaining)
+                )
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries or not self._can_retry_error(method, e):
+                    raise
+                delay = self._backoff(attempt)
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    raise
+                print(f"⚠️ {method} {url} failed ({e}), retrying in {delay:.1f}s")
+            else:
+                delay = self._retry_delay(method, response, attempt)
+                if delay is None or (
+                    deadline is not None and time.monotonic() + delay >= deadline
+                ):
+                    return response
+                print(
+                    f"⚠️ {method} {url} returned {response.status_code}, "
+                    f"retrying in {delay:.1f}s"
+                )
+                response.close()
+
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def _can_retry_error(self, method, error):
+        # A connect timeout never reached the server, so any method is safe.
+        if isinstance(error, requests.ConnectTimeout):
+            return True
+        if isinstance(error, requests.ReadTimeout) and not self.retry_read_timeouts:
+            return False
+        return method in self.retry_methods
+
+    def _retry_delay(self, method, response, attempt):
+        """
+        Returns how long to wait before retrying ``response``, or None when
+        it should be handed back to the caller as is.
+        """
+        if attempt >= self.max_retries:
+            return None
+
+        if self._is_rate_limited(response):
+            wait = self._rate_limit_wait(response)
+            if wait is None:
+                return self._backoff(attempt)
+            if wait > self.rate_limit_max_wait:
+                print(f"⚠️ Rate limited for {wait:.0f}s, not retrying")
+                return None
+            return wait + random.uniform(0, 1)
+
+        if response.status_code in RETRY_STATUS_CODES and (
+            method in self.retry_methods
+        ):
+            return self._backoff(attempt)
+
+        return None
+
+    @staticmethod
+    def _is_rate_limited(response):
+        if response.status_code == 429:
+            return True
+        return response.status_code == 403 and (
+            "Retry-After" in response.headers
+            or response.headers.get("X-RateLimit-Remaining") == "0"
+        )
+
+    @staticmethod
+    def _rate_limit_wait(response):
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(retry_after).timestamp()
+                    return max(0.0, retry_at - time.time())
+                except (TypeError, ValueError):
+                    pass
+
+        reset = response.headers.get("X-RateLimit-Reset")
+        if reset and response.headers.get("X-RateLimit-Remaining") == "0":
+            try:
+                return max(0.0, float(reset) - time.time())
+            except ValueError:
+                pass
+
+        return None
+
+    def _backoff(self, attempt):
+        delay = min(self.max_backoff, self.backoff_factor * (2**attempt))
+        return random.uniform(delay / 2, delay)
+
+
+def build_client(name, **overrides):
+    """
+    Creates a new client for ``name`` ("github" or "ollama") from
+    ``REVIEW_CONFIG["http"]``. Keyword arguments override the configuration.
+    """
+    http_config = REVIEW_CONFIG.get("http", {})
+    service_config = http_config.get(name, {})
+    settings = {
+        "connect_timeout": service_config.get("connectTimeout", 10),
+        "read_timeout": service_config.get("readTimeout", 30),
+        "max_retries": http_config.get("maxRetries", 3),
+        "backoff_factor": http_config.get("backoffFactor", 1.0),
+        "max_backoff": http_config.get("maxBackoff", 30),
+        "rate_limit_max_wait": http_config.get("rateLimitMaxWait", 120),
+        "pool_maxsize": http_config.get("poolMaxsize", 10),
+        # Generation requests have no side effects, so POSTs to Ollama are
+        # safe to repeat.
+        "retry_methods": IDEMPOTENT_METHODS + (("POST",) if name == "ollama" else ()),
+        # A generation that ran into the long Ollama read timeout would only
+        # block a worker as long again; connect errors and 5xx are retried.
+        "retry_read_timeouts": name != "ollama",
+    }
+    settings.update(overrides)
+    return HttpClient(**settings)
+
+
+def get_client(name):
+    """
+    Returns the shared client for ``name`` ("github" or "ollama"), creating
+    it from ``REVIEW_CONFIG["http"]`` on first use.
+    """
+    with _clients_lock:
+        if name not in _clients:
+            _clients[name] = build_client(name)
+        return _clients[name]
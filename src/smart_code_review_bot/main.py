@@ -0,0 +1,703 @@
+import argparse
+import os
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from .config import REVIEW_CONFIG
+from .diff_lines import DiffLines
+from .file_source import GitHubFiles, get_source, set_source
+from .git_diff import extension_pathspecs
+from .github import GitHubAPI
+from .metrics import configure_logging, get_metrics, logger
+from .ollama import OllamaAPI
+from .ollama_pool import get_pool
+from .packing import demux_reviews, make_segment, pack_segments, split_segment
+from .review_cache import ReviewCache
+from .review_budget import ReviewBudget
+from .review_dedup import CommentIndex, format_finding
+from .review_state import ReviewState, hunk_id
+from .triage import Triage
+
+# Constants and configuration
+BASE_BRANCH = os.getenv("BASE_BRANCH", "origin/master")
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+GITHUB_REPOSITORY = os.getenv("GITHUB_REPOSITORY")
+GITHUB_REPOSITORY_OWNER = os.getenv("GITHUB_REPOSITORY_OWNER")
+PR_NUMBER = os.getenv("PR_NUMBER")
+GITHUB_SHA = os.getenv("GITHUB_SHA")
+
+
+def merge_comments(comments):
+    merged_comments = {}
+    for comment in comments:
+        key = f"{comment['path']}:{comment['line']}"
+        if key not in merged_comments:
+            merged_comments[key] = {
+                "path": comment["path"],
+                "line": comment["line"],
+                "side": "RIGHT",
+                "body": format_finding(comment),
+            }
+        else:
+            merged_comments[key]["body"] += f"\n\n{format_finding(comment)}"
+    return list(merged_comments.values())
+
+
+def get_changed_lines(hunk):
+    return DiffLines.from_hunk(hunk)
+
+
+def build_segment(hunk, file):
+    lines = get_changed_lines(hunk)
+    if not lines:
+        return None
+    return make_segment(file.path, lines)
+
+
+def exceeds_max_file_size(file):
+    """
+    Checks ``file`` against ``REVIEW_CONFIG["maxFileSize"]`` using the size
+    on disk, or the size of its added lines when it is not checked out.
+    """
+    max_file_size = REVIEW_CONFIG.get("maxFileSize")
+    if not max_file_size:
+        return False
+    size = get_source().size(file.path)
+    if size is None:
+        size = sum(len(line.value) for hunk in file for line in hunk if line.is_added)
+    if size > max_file_size:
+        print(f"Skipping {file.path}: {size} bytes exceeds maxFileSize")
+        return True
+    return False
+
+
+def get_cached_review(segment, ollama, review_cache):
+    segment["cache_key"], base_line = review_cache.make_key(
+        ollama.model, segment["path"], segment["lines"]
+    )
+    reviews = review_cache.get(segment["cache_key"], base_line)
+    if reviews is not None:
+        print(f"Using cached review for {segment['path']}:{base_line}")
+        return [{**review, "path": segment["path"]} for review in reviews]
+    return None
+
+
+def review_pack(pack, ollama, review_cache=None):
+    """
+    Reviews a group of segments with one Ollama generation.
+
+    Args:
+        pack (list): Segments built by ``build_segment``.
+        ollama (OllamaAPI): Client used for the review.
+        review_cache (ReviewCache, optional): Cache filled with the reviews
+            of every segment.
+
+    Returns:
+        list: One list of findings per segment, in pack order.
+    """
+    outcome = {}
+    if len(pack) == 1:
+        segment = pack[0]
+        print(f"Reviewing {segment['path']} lines {segment['start']}-{segment['end']}")
+        logger.debug(
+            "Review context:\n%s\nchanged_lines %s",
+            segment["content"],
+            segment["added_lines"],
+        )
+        reviews = ollama.review_code(
+            content=segment["content"],
+            filename=segment["path"],
+            changed_lines=segment["added_lines"],
+            outcome=outcome,
+        )
+    else:
+        print(
+            f"Reviewing {len(pack)} hunks from "
+            f"{', '.join(sorted({segment['path'] for segment in pack}))} in one prompt"
+        )
+        reviews = ollama.review_segments(pack, outcome=outcome)
+    # GitHub rejects the whole review if one comment is outside the diff.
+    routed = demux_reviews(pack, reviews)
+    logger.debug("Reviews returned by Ollama: %s", routed)
+
+    # Without a closed array the answer was garbled or cut off, so its
+    # findings, or lack of them, are not worth remembering.
+    if not outcome.get("closed"):
+        print(f"⚠️ No complete review array for {pack[0]['path']}, not caching")
+        review_cache = None
+
+    results = []
+    for segment, reviews in zip(pack, routed):
+        if review_cache is not None and "cache_key" in segment:
+            review_cache.put(segment["cache_key"], segment["start"], reviews)
+        results.append([{**review, "path": segment["path"]} for review in reviews])
+    return results
+
+
+def build_review(findings, note=""):
+    """
+    Splits the findings of a whole run into inline review comments and a
+    single summary body holding the general comments.
+
+    Args:
+        findings (list): Review dicts with ``path``, ``line``, ``type``,
+            ``severity`` and ``message`` keys. ``line`` is None for general
+            comments.
+        note (str, optional): Markdown appended to the body, e.g. the hunks
+            a budgeted run did not get to.
+
+    Returns:
+        tuple: ``(comments, body)`` ready for ``GitHubAPI.create_review``.
+    """
+    inline_findings = [f for f in findings if f.get("line") is not None]
+    general_findings = [f for f in findings if f.get("line") is None]
+
+    body = "Automated review by Ollama Code Review Bot"
+    if general_findings:
+        body += "\n\n### General comments\n"
+        for finding in general_findings:
+            body += f"\n- `{finding['path']}`: {finding['message']}"
+    if note:
+        body += f"\n\n{note}"
+
+    return merge_comments(inline_findings), body
+
+
+def dedupe_findings(github, findings):
+    """
+    Drops findings already posted on the pull request by a previous run and
+    appends new findings on an already commented line to that comment.
+
+    Returns:
+        list: The findings that still need a new review comment.
+    """
+    owner, repo = GITHUB_REPOSITORY_OWNER, GITHUB_REPOSITORY.split("/")[1]
+    index = CommentIndex.load(github, owner, repo, PR_NUMBER)
+    findings, updates = index.dedupe(findings)
+
+    for comment_id, (comment, new_findings) in updates.items():
+        body = "\n\n".join(
+            [comment["body"]] + [format_finding(finding) for finding in new_findings]
+        )
+        github.update_review_comment(owner, repo, comment_id, body)
+    if updates:
+        print(f"Updated {len(updates)} existing review comments in place")
+    return findings
+
+
+def post_review(github, findings, note=""):
+    if findings and REVIEW_CONFIG.get("deduplicateComments", True):
+        findings = dedupe_findings(github, findings)
+    if not findings and not note:
+        print("No review comments to post.")
+        return None
+
+    comments, body = build_review(findings, note)
+    response = github.create_review(
+        GITHUB_REPOSITORY_OWNER,
+        GITHUB_REPOSITORY.split("/")[1],
+        PR_NUMBER,
+        comments,
+        body=body,
+    )
+    print(f"Posted review with {len(comments)} inline comments")
+    return response
+
+
+def iter_pending(
+    files,
+    ollama,
+    entries,
+    results,
+    review_cache=None,
+    hunk_filter=None,
+    score=None,
+):
+    """
+    Turns the hunks of ``files`` into segments still to be reviewed, reading
+    ``files`` lazily and yielding one list of segments per file.
+
+    Hunks are filtered, triaged (see ``triage.Triage``), split to the token
+    budget and answered from ``review_cache`` where possible. Every hunk that
+    passes ``hunk_filter`` is appended to ``entries`` as a ``(path, hunk_id)``
+    pair and its findings known so far to ``results``; segments carry the
+    ``index`` of their entry. No file or hunk is kept once its segments
+    have been yielded.
+
+    Args:
+        files (iterable): Patched files, each an iterable of hunks.
+        ollama (OllamaAPI): Client the hunks will be reviewed with.
+        entries (list): Filled with the ``(path, hunk_id)`` pairs, in diff
+            order.
+        results (list): Filled with one list of findings per entry.
+        review_cache (ReviewCache, optional): Cache consulted for every hunk.
+        hunk_filter (callable, optional): ``hunk_filter(file, hunk)`` returns
+            False for hunks that should not be reviewed.
+        score (callable, optional): ``score(file, hunk)``, stored as the
+            ``score`` of the hunk's segments.
+
+    Yields:
+        list: The segments of one file that need a model review.
+    """
+    budget = REVIEW_CONFIG.get("tokenBudget", {})
+    triage = Triage.from_config()
+
+    for file in files:
+        hunks = [
+            hunk for hunk in file if hunk_filter is None or hunk_filter(file, hunk)
+        ]
+        if not hunks:
+            continue
+        first_index = len(entries)
+        entries.extend((file.path, hunk_id(file.path, hunk)) for hunk in hunks)
+        results.extend([] for _ in hunks)
+
+        if not ollama.should_review_file(file.path):
+            print(f"Skipping review for unsupported file type: {file.path}")
+            continue
+        if exceeds_max_file_size(file):
+            continue
+
+        pending = []
+        for index, hunk in enumerate(hunks, start=first_index):
+            if triage is not None and triage.skip_reason(file, hunk):
+                continue
+            segment = build_segment(hunk, file)
+            if segment is None:
+                continue
+            hunk_score = score(file, hunk) if score is not None else None
+            for piece in split_segment(
+                segment,
+                budget.get("maxHunkTokens", 1500),
+                overlap_lines=budget.get("overlapLines", 3),
+            ):
+                piece["index"] = index
+                piece["score"] = hunk_score
+                if review_cache is not None:
+                    findings = get_cached_review(piece, ollama, review_cache)
+                    if findings is not None:
+                        results[index].extend(findings)
+                        continue
+                pending.append(piece)
+        yield pending
+
+    if triage is not None:
+        triage.report()
+
+
+def pack_pending(pending):
+    """
+    Groups segments into prompts according to ``REVIEW_CONFIG["packing"]``.
+    """
+    packing = REVIEW_CONFIG.get("packing", {})
+    if not packing.get("enabled", False):
+        return [[segment] for segment in pending]
+    return pack_segments(
+        pending,
+        packing.get("maxPromptTokens", 2048),
+        max_segments=packing.get("maxHunksPerPrompt", 12),
+        cross_file=packing.get("crossFile", True),
+    )
+
+
+def prepare_review(files, ollama, review_cache=None, hunk_filter=None, budget=None):
+    """
+    Turns the hunks of ``files`` into review prompts, see ``iter_pending``.
+
+    Args:
+        files (iterable): Patched files, each an iterable of hunks.
+        ollama (OllamaAPI): Client the hunks will be reviewed with.
+        review_cache (ReviewCache, optional): Cache consulted for every hunk.
+        hunk_filter (callable, optional): ``hunk_filter(file, hunk)`` returns
+            False for hunks that should not be reviewed.
+        budget (ReviewBudget, optional): Orders the prompts riskiest first
+            and leaves out those beyond its token budget.
+
+    Returns:
+        tuple: ``(entries, results, packs)``. ``entries`` lists the
+        ``(path, hunk_id)`` pairs in diff order, ``results`` holds the findings
+        known so far for each entry, and ``packs`` the segments still to be
+        reviewed, grouped by prompt.
+    """
+    entries, results, pending = [], [], []
+    for segments in iter_pending(
+        files,
+        ollama,
+        entries,
+        results,
+        review_cache,
+        hunk_filter,
+        score=budget.score if budget is not None else None,
+    ):
+        pending.extend(segments)
+    if budget is not None:
+        pending = budget.rank(pending)
+
+    packs = []
+    for pack in pack_pending(pending):
+        if budget is None or budget.admit(pack):
+            packs.append(pack)
+        else:
+            record_pack_findings(results, pack, [None] * len(pack))
+    print(
+        f"Reviewing {sum(len(pack) for pack in packs)} hunks in "
+        f"{len(packs)} prompts"
+    )
+
+    return entries, results, packs
+
+
+def record_pack_findings(results, pack, pack_findings, error=None, budget=None):
+    """
+    Stores the outcome of one reviewed pack in ``results``. A failed pack
+    marks every hunk it covers as failed (None); once the time ``budget``
+    has run out, it is recorded as skipped instead.
+    """
+    if error is not None and budget is not None and budget.expired():
+        budget.skip(pack)
+        error, pack_findings = None, [None] * len(pack)
+    if error is not None:
+        paths = ", ".join(sorted({segment["path"] for segment in pack}))
+        if isinstance(error, requests.exceptions.HTTPError):
+            print(f"HTTP error occurred while reviewing {paths}: {error}")
+        else:
+            print(f"An error occurred while reviewing {paths}: {error}")
+        pack_findings = [None] * len(pack)
+
+    for segment, findings in zip(pack, pack_findings):
+        if findings is None:
+            results[segment["index"]] = None
+        elif results[segment["index"]] is not None:
+            results[segment["index"]].extend(findings)
+
+
+def review_files(
+    files,
+    ollama,
+    concurrency_limit=None,
+    review_cache=None,
+    hunk_filter=None,
+    budget=None,
+):
+    """
+    Reviews every hunk of every file, running up to ``concurrency_limit``
+    Ollama generations at once. Small hunks are packed into shared prompts
+    according to ``REVIEW_CONFIG["packing"]``. ``files`` is read lazily and
+    prompts are reviewed as soon as they are complete, while later files
+    are still being read.
+
+    Args:
+        files (iterable): Patched files, each an iterable of hunks.
+        ollama (OllamaAPI): Client used to review each hunk.
+        concurrency_limit (int, optional): Maximum number of prompts reviewed
+            in parallel. Defaults to ``REVIEW_CONFIG["concurrencyLimit"]`` or
+            the combined capacity of the Ollama pool, whichever is larger.
+        review_cache (ReviewCache, optional): Cache consulted before, and
+            filled after, every Ollama review.
+        hunk_filter (callable, optional): ``hunk_filter(file, hunk)`` returns
+            False for hunks that should not be reviewed.
+        budget (ReviewBudget, optional): Time and token budget, started with
+            ``start_budget``. The whole diff is then read first and reviewed
+            riskiest hunk first; prompts that do not fit or finish in time
+            are recorded in ``budget.skipped`` and their hunks yield None.
+
+    Returns:
+        list: ``(path, hunk_id, findings)`` tuples in diff order. A hunk
+        whose review failed yields None instead of a list.
+    """
+    if concurrency_limit is None:
+        concurrency_limit = max(
+            REVIEW_CONFIG.get("concurrencyLimit", 1), ollama.pool.capacity
+        )
+    concurrency_limit = max(1, int(concurrency_limit))
+
+    entries, results = [], []
+
+    def review_in_budget(pack):
+        budget.check()
+        return review_pack(pack, ollama, review_cache)
+
+    with ThreadPoolExecutor(max_workers=concurrency_limit) as executor:
+        jobs = []
+
+        def submit(packs):
+            for pack in packs:
+                if budget is None:
+                    future = executor.submit(review_pack, pack, ollama, review_cache)
+                elif budget.admit(pack):
+                    future = executor.submit(review_in_budget, pack)
+                else:
+                    record_pack_findings(results, pack, [None] * len(pack))
+                    continue
+                jobs.append((pack, future))
+
+        pending = []
+        for segments in iter_pending(
+            files,
+            ollama,
+            entries,
+            results,
+            review_cache,
+            hunk_filter,
+            score=budget.score if budget is not None else None,
+        ):
+            pending.extend(segments)
+            if budget is not None:
+                continue
+            packs = pack_pending(pending)
+            # Packing is greedy in diff order, so later segments can only
+            # join the last pack: the others are final.
+            submit(packs[:-1])
+            pending = packs[-1] if packs else []
+        if budget is not None:
+            pending = budget.rank(pending)
+        submit(pack_pending(pending))
+        print(
+            f"Reviewing {sum(len(pack) for pack, _ in jobs)} hunks in "
+            f"{len(jobs)} prompts"
+        )
+
+        # At the deadline the Ollama pool cuts generations still running
+        # short (see ``start_budget``), so these never wait past it.
+        for pack, future in jobs:
+            try:
+                record_pack_findings(results, pack, future.result())
+            except Exception as err:
+                record_pack_findings(results, pack, None, error=err, budget=budget)
+
+    if budget is not None and budget.skipped:
+        print(f"⏱️ Review budget exhausted: {len(budget.skipped)} hunks skipped")
+    return [(path, key, findings) for (path, key), findings in zip(entries, results)]
+
+
+def get_head_sha():
+    return get_source().head_sha()
+
+
+def load_review_state(github, head_sha, paths=()):
+    """
+    Loads the incremental review state of the pull request.
+
+    Returns:
+        ReviewState: The state, or None when ``head_sha`` has already been
+        reviewed in full and there is nothing left to do.
+    """
+    state = ReviewState.load(
+        github, GITHUB_REPOSITORY_OWNER, GITHUB_REPOSITORY.split("/")[1], PR_NUMBER
+    )
+    if state.sha == head_sha and not paths:
+        print(f"{head_sha} has already been reviewed, skipping")
+        return None
+    print(f"Incremental review: {len(state)} hunks already reviewed")
+    return state
+
+
+def make_hunk_filter(paths=(), state=None):
+    """
+    Builds a ``hunk_filter`` for ``review_files`` that keeps hunks of
+    ``paths`` (all files when empty) not already recorded in ``state``.
+    """
+    paths = set(paths)
+
+    def should_review(file, hunk):
+        if paths and file.path not in paths:
+            return False
+        return state is None or not state.is_reviewed(
+            file.path, hunk_id(file.path, hunk)
+        )
+
+    return should_review
+
+
+def track_hunks(files, current_hunks):
+    """
+    Passes ``files`` through, adding the ``hunk_id`` of each of their hunks
+    to ``current_hunks``, a dict of sets keyed by path.
+    """
+    for file in files:
+        current_hunks.setdefault(file.path, set()).update(
+            hunk_id(file.path, hunk) for hunk in file
+        )
+        yield file
+
+
+def finish_review(
+    github,
+    files,
+    results,
+    state=None,
+    paths=(),
+    head_sha=None,
+    current_hunks=None,
+    note="",
+):
+    """
+    Posts the findings of a run and, in incremental mode, records which
+    hunks have been reviewed.
+
+    Args:
+        github (GitHubAPI): Client used to post the review.
+        files (PatchSet): The diff the run read.
+        results (iterable): ``(path, hunk_id, findings)`` tuples;
+            ``findings`` is None for hunks whose review failed.
+        state (ReviewState, optional): Incremental review state to update.
+        paths (iterable): Files the run was restricted to, if any.
+        head_sha (str, optional): Commit the run reviewed.
+        current_hunks (dict, optional): Path to ``hunk_id`` set of every hunk
+            read, used instead of ``files`` when the diff has been streamed.
+        note (str, optional): Markdown appended to the review body.
+    """
+    findings = []
+    reviewed = {}
+    complete = True
+    for path, key, hunk_findings in results:
+        if hunk_findings is None:
+            complete = False
+            continue
+        findings.extend(hunk_findings)
+        reviewed.setdefault(path, set()).add(key)
+
+    post_review(github, findings, note)
+
+    if state is not None:
+        current = current_hunks
+        if current is None:
+            current = {
+                file.path: {hunk_id(file.path, hunk) for hunk in file} for file in files
+            }
+        # A run restricted to paths read only those files' hunks.
+        state.update(current, reviewed, whole_diff=not paths)
+        # A same-SHA re-run is only skipped once nothing is left to retry.
+        if not paths and complete:
+            state.sha = head_sha
+        state.save(
+            github, GITHUB_REPOSITORY_OWNER, GITHUB_REPOSITORY.split("/")[1], PR_NUMBER
+        )
+
+
+def add_checkout_argument(parser):
+    parser.add_argument(
+        "--no-checkout",
+        action="store_true",
+        default=os.getenv("REVIEW_SOURCE") == "github",
+        help="Read the diff and files from the GitHub API instead of git",
+    )
+
+
+def use_github_files(github):
+    """
+    Makes every stage read the pull request through ``github`` instead of
+    the working tree, see ``file_source.GitHubFiles``.
+    """
+    set_source(
+        GitHubFiles(
+            github,
+            GITHUB_REPOSITORY_OWNER,
+            GITHUB_REPOSITORY.split("/")[1],
+            PR_NUMBER,
+        )
+    )
+
+
+def add_budget_arguments(parser):
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=float(os.getenv("REVIEW_TIME_BUDGET") or 0) or None,
+        help="Seconds to spend on model generations; the riskiest hunks are "
+        "reviewed first and the rest are listed in the review",
+    )
+    parser.add_argument(
+        "--token-budget",
+        type=int,
+        default=None,
+        help="Estimated prompt tokens to spend on model reviews",
+    )
+
+
+def start_budget(args):
+    """
+    Builds the ``ReviewBudget`` of a run from its arguments and starts its
+    clock. Its deadline also applies to the shared Ollama pool, which stops
+    every generation still running when it passes.
+    """
+    budget = ReviewBudget.from_config(args.time_budget, args.token_budget)
+    if budget is not None and budget.deadline is not None:
+        get_pool().set_deadline(budget.remaining())
+    return budget
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Ollama code review bot")
+    parser.add_argument(
+        "paths", nargs="*", help="Only review these files (default: all changed)"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        default=os.getenv("REVIEW_MODE") == "incremental",
+        help="Only review hunks not covered by a previous run on this PR",
+    )
+    add_budget_arguments(parser)
+    add_checkout_argument(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging()
+    # Started first so the deadline covers the whole run.
+    budget = start_budget(args)
+    try:
+        github = GitHubAPI(GITHUB_TOKEN)
+        ollama = OllamaAPI()
+        if args.no_checkout:
+            use_github_files(github)
+        head_sha = get_head_sha()
+
+        state = None
+        if args.incremental:
+            state = load_review_state(github, head_sha, args.paths)
+            if state is None:
+                return
+
+        # Deleted files and unsupported file types are dropped while the
+        # diff is read, by git itself when there is a checkout.
+        files = get_source().iter_diff(
+            args.paths,
+            diff_filter="d",
+            pathspecs=extension_pathspecs(REVIEW_CONFIG.get("supportedExtensions")),
+        )
+        current_hunks = {}
+        review_cache = ReviewCache.from_config()
+        try:
+            results = review_files(
+                track_hunks(files, current_hunks),
+                ollama,
+                review_cache=review_cache,
+                hunk_filter=make_hunk_filter(args.paths, state),
+                budget=budget,
+            )
+        finally:
+            if review_cache is not None:
+                review_cache.close()
+
+        finish_review(
+            github,
+            (),
+            results,
+            state,
+            args.paths,
+            head_sha,
+            current_hunks,
+            note=budget.note() if budget is not None else "",
+        )
+
+        get_metrics().finish()
+        print("Code review completed successfully")
+    except Exception as e:
+        print(f"Error in code review process: {e}")
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Import config
+from .config import REVIEW_CONFIG
+
+# Prompts and raw model output are logged on this logger at DEBUG level.
+logger = logging.getLogger("smart_code_review")
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def configure_logging():
+    """
+    Sets the log level from ``REVIEW_LOG_LEVEL`` (default INFO). Use DEBUG
+    to print every prompt and model response.
+    """
+    level = os.getenv("REVIEW_LOG_LEVEL", "INFO").upper()
+    logging.basicConfig(
+        format="%(message)s", level=getattr(logging, level, logging.INFO)
+    )
+
+
+class Metrics:
+    """
+    Run-wide timings and Ollama inference statistics.
+
+    ``span`` accumulates wall time per stage (diff parsing, AST parsing,
+    prompt building, generation, GitHub calls, ...). ``record_generation``
+    keeps the token counts and durations Ollama reports with each response,
+    from which prompt evaluation and generation speeds are derived per model.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.spans = {}
+        self.models = {}
+
+    @contextmanager
+    def span(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def observe(self, name, seconds):
+        with self._lock:
+            span = self.spans.setdefault(
+                name, {"count": 0, "seconds": 0.0, "max_seconds": 0.0}
+            )
+            span["count"] += 1
+            span["seconds"] += seconds
+            span["max_seconds"] = max(span["max_seconds"], seconds)
+
+    def record_generation(self, model, data):
+        """
+        Adds the statistics of a finished Ollama response.
+
+        Args:
+            model (str): Model that served the request.
+            data (dict): The final response object. Its ``prompt_eval_count``,
+                ``prompt_eval_duration``, ``eval_count``, ``eval_duration``
+                and ``load_duration`` fields are used when present;
+                durations are in nanoseconds. Without ``prompt_eval_count``
+                the request only counts in ``requests_without_stats``.
+        """
+        with self._lock:
+            stats = self.models.setdefault(
+                model,
+                {
+                    "requests": 0,
+                    "requests_without_stats": 0,
+                    "prompt_eval_count": 0,
+                    "prompt_eval_seconds": 0.0,
+                    "eval_count": 0,
+                    "eval_seconds": 0.0,
+                    "load_seconds": 0.0,
+                },
+            )
+            stats["requests"] += 1
+            if "prompt_eval_count" in data:
+                stats["prompt_eval_count"] += data["prompt_eval_count"] or 0
+                stats["prompt_eval_seconds"] += (
+                    data.get("prompt_eval_duration") or 0
+                ) / 1e9
+            else:
+                # Closed before Ollama's final statistics: the prompt side is
+                # unknown, not zero.
+                stats["requests_without_stats"] += 1
+            stats["eval_count"] += data.get("eval_count") or 0
+            stats["eval_seconds"] += (data.get("eval_duration") or 0) / 1e9
+            stats["load_seconds"] += (data.get("load_duration") or 0) / 1e9
+
+    def summary(self):
+        with self._lock:
+            models = {}
+            for model, stats in self.models.items():
+                stats = dict(stats)
+                stats["prompt_tokens_per_second"] = _rate(
+                    stats["prompt_eval_count"], stats["prompt_eval_seconds"]
+                )
+                stats["tokens_per_second"] = _rate(
+                    stats["eval_count"], stats["eval_seconds"]
+                )
+                models[model] = stats
+            return {
+                "wall_seconds": round(time.perf_counter() - self.started, 3),
+                "spans": {name: dict(span) for name, span in self.spans.items()},
+                "models": models,
+            }
+
+    def report(self):
+        summary = self.summary()
+        print(f"⏱️ Run took {summary['wall_seconds']:.1f}s")
+        for name, span in sorted(summary["spans"].items()):
+            print(
+                f"   {name}: {span['seconds']:.2f}s over {span['count']} calls "
+                f"(max {span['max_seconds']:.2f}s)"
+            )
+        for model, stats in summary["models"].items():
+            if stats["prompt_tokens_per_second"] is None:
+                prompt = "prompt tokens not reported"
+            else:
+                prompt = (
+                    f"{stats['prompt_eval_count']} prompt tokens at "
+                    f"{stats['prompt_tokens_per_second']:.0f}/s"
+                )
+            if stats["tokens_per_second"] is None:
+                generated = "generation not timed"
+            else:
+                generated = (
+                    f"{stats['eval_count']} generated at "
+                    f"{stats['tokens_per_second']:.1f}/s"
+                )
+            unmeasured = stats["requests_without_stats"]
+            note = (
+                f" ({unmeasured} of {stats['requests']} requests closed before "
+                "Ollama sent its statistics)"
+                if unmeasured
+                else ""
+            )
+            print(f"   {model}: {prompt}, {generated}{note}")
+        return summary
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2, sort_keys=True)
+
+    def write_prometheus(self, path):
+        """
+        Writes the summary in the Prometheus text format, for the node
+        exporter's textfile collector. The file is replaced atomically.
+        """
+        summary = self.summary()
+        lines = [
+            "# TYPE smart_code_review_run_seconds gauge",
+            f"smart_code_review_run_seconds {summary['wall_seconds']}",
+            "# TYPE smart_code_review_span_seconds gauge",
+        ]
+        for name, span in sorted(summary["spans"].items()):
+            lines.append(
+                f'smart_code_review_span_seconds{{span="{name}"}} {span["seconds"]:.6f}'
+            )
+        lines.append("# TYPE smart_code_review_span_count gauge")
+        for name, span in sorted(summary["spans"].items()):
+            lines.append(
+                f'smart_code_review_span_count{{span="{name}"}} {span["count"]}'
+            )
+        for field in (
+            "requests",
+            "requests_without_stats",
+            "prompt_eval_count",
+            "eval_count",
+            "prompt_tokens_per_second",
+            "tokens_per_second",
+        ):
+            lines.append(f"# TYPE smart_code_review_model_{field} gauge")
+            for model, stats in sorted(summary["models"].items()):
+                # A rate nothing was measured for is left out, not zero.
+                if stats[field] is None:
+                    continue
+                lines.append(
+                    f'smart_code_review_model_{field}{{model="{model}"}} {stats[field]}'
+                )
+
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(temporary, path)
+
+    def finish(self):
+        """
+        Prints the summary and writes the files configured in
+        ``REVIEW_CONFIG["metrics"]`` or the ``REVIEW_METRICS_JSON`` and
+        ``REVIEW_METRICS_PROMETHEUS`` environment variables.
+        """
+        self.report()
+        metrics_config = REVIEW_CONFIG.get("metrics", {})
+        json_path = os.getenv("REVIEW_METRICS_JSON") or metrics_config.get("jsonPath")
+        prometheus_path = os.getenv("REVIEW_METRICS_PROMETHEUS") or metrics_config.get(
+            "prometheusPath"
+        )
+        try:
+            if json_path:
+                self.write_json(json_path)
+            if prometheus_path:
+                self.write_prometheus(prometheus_path)
+        except OSError as e:
+            print(f"⚠️ Could not write metrics: {e}")
+
+
+def _rate(count, seconds):
+    # None when nothing was timed, so no measurement is reported as zero.
+    return round(count / seconds, 2) if seconds else None
+
+
+def get_metrics():
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics()
+        return _metrics
+
+
+def span(name):
+    return get_metrics().span(name)
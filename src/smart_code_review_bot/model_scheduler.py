@@ -0,0 +1,112 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .ollama_pool import get_pool
+
+# Import config
+from .config import REVIEW_CONFIG
+
+
+class ModelScheduler:
+    """
+    Runs generation jobs from every stage grouped by model.
+
+    Each group runs while its model is resident: the model is loaded and
+    pinned with ``keep_alive`` before the first job, and unloaded after the
+    last one so the next model does not have to evict it. Time spent loading
+    models and time spent generating are tracked separately.
+
+    With a ``budget`` (see ``review_budget.ReviewBudget``), jobs that have
+    not started by its deadline fail with ``BudgetExceeded`` instead of
+    running, and no further model is loaded.
+    """
+
+    def __init__(self, pool=None, concurrency_limit=None, unload=None, budget=None):
+        scheduling = REVIEW_CONFIG.get("modelScheduling", {})
+        self.pool = pool or get_pool()
+        if concurrency_limit is None:
+            concurrency_limit = max(
+                REVIEW_CONFIG.get("concurrencyLimit", 1), self.pool.capacity
+            )
+        self.concurrency_limit = max(1, int(concurrency_limit))
+        self.keep_alive = scheduling.get("keepAlive", "30m")
+        self.unload = (
+            scheduling.get("unloadAfterGroup", True) if unload is None else unload
+        )
+        self.budget = budget
+        self.jobs = {}
+        self.stats = {}
+
+    def submit(self, model, fn, *args, callback=None, **kwargs):
+        """
+        Queues ``fn(*args, **kwargs)`` to run while ``model`` is loaded.
+
+        ``callback(result, error)`` is called from the scheduler thread once
+        the job has finished; exactly one of the two is None.
+        """
+        self.jobs.setdefault(model, []).append((fn, args, kwargs, callback))
+
+    def _keep_alive(self, model, keep_alive):
+        # A generate request without a prompt only loads (or, with a
+        # keep_alive of 0, unloads) the model.
+        if not self.pool.broadcast(
+            "/api/generate",
+            model=model,
+            json={"model": model, "keep_alive": keep_alive},
+        ):
+            raise RuntimeError("no Ollama endpoint accepted the request")
+
+    def _run_job(self, fn, args, kwargs):
+        if self.budget is not None:
+            self.budget.check()
+        return fn(*args, **kwargs)
+
+    def run(self):
+        for model, jobs in self.jobs.items():
+            stats = self.stats.setdefault(
+                model, {"jobs": 0, "failed": 0, "load": 0.0, "generation": 0.0}
+            )
+            started = time.perf_counter()
+            if self.budget is not None and self.budget.expired():
+                print(f"⏱️ Time budget exhausted, not loading {model}")
+            else:
+                print(f"🧠 Loading {model} for {len(jobs)} jobs")
+                try:
+                    self._keep_alive(model, self.keep_alive)
+                except Exception as e:
+                    print(f"⚠️ Could not preload {model}: {e}")
+            stats["load"] += time.perf_counter() - started
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=self.concurrency_limit) as executor:
+                futures = [
+                    (callback, executor.submit(self._run_job, fn, args, kwargs))
+                    for fn, args, kwargs, callback in jobs
+                ]
+                for callback, future in futures:
+                    stats["jobs"] += 1
+                    try:
+                        result, error = future.result(), None
+                    except Exception as e:
+                        result, error = None, e
+                        stats["failed"] += 1
+                    if callback is not None:
+                        callback(result, error)
+            stats["generation"] += time.perf_counter() - started
+
+            if self.unload:
+                try:
+                    self._keep_alive(model, 0)
+                except Exception as e:
+                    print(f"⚠️ Could not unload {model}: {e}")
+
+        self.jobs = {}
+        self.report()
+        return self.stats
+
+    def report(self):
+        for model, stats in self.stats.items():
+            print(
+                f"⏱️ {model}: {stats['jobs']} jobs ({stats['failed']} failed), "
+                f"load {stats['load']:.1f}s, generation {stats['generation']:.1f}s"
+            )
@@ -0,0 +1,262 @@
+import json
+import logging
+import requests
+import re
+import threading
+import time
+from .metrics import get_metrics, logger, span
+from .ollama_pool import get_pool
+from .packing import estimate_tokens
+from .stream_json import iter_json_objects
+
+# Import config
+from .config import REVIEW_CONFIG
+
+
+class OllamaAPI:
+    def __init__(self, model="codellama", keep_alive=None):
+        self.pool = get_pool()
+        self.model = model
+        self.keep_alive = keep_alive
+        self.file_pattern = REVIEW_CONFIG.get("supportedExtensions", "**/*.{ts,tsx}")
+        self.prompt_cache = REVIEW_CONFIG.get("promptCache", {})
+        # Last context Ollama returned per file, for promptCache.reuseContext.
+        self._contexts = {}
+        self._contexts_lock = threading.Lock()
+
+    def should_review_file(self, filename):
+        return bool(re.search(self.file_pattern, filename))
+
+    def make_request(self, endpoint, data):
+        headers = {"Content-Type": "application/json"}
+
+        try:
+            response = self.pool.post(
+                endpoint, model=self.model, headers=headers, json=data, stream=True
+            )
+            if not response.ok:
+                response.close()
+            response.raise_for_status()
+            return response
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Ollama API request failed: {e}")
+
+    def _iter_stream_fragments(self, response, progress):
+        for line in response.iter_lines():
+            if not line:
+                continue
+            try:
+                json_object = json.loads(line.decode("utf-8"))
+            except json.JSONDecodeError:
+                print(f"Skipping invalid JSON fragment: {line.decode('utf-8')}")
+                continue
+            if "first_token_at" not in progress:
+                progress["first_token_at"] = time.perf_counter()
+            progress["fragments"].append(json_object.get("response", ""))
+            yield json_object.get("response", "")
+            if json_object.get("done"):
+                progress["done"] = json_object
+                return
+
+    def _handle_streaming_response(
+        self, response, started, context_key=None, outcome=None
+    ):
+        """
+        Yields review objects from a streamed generation as they complete.
+
+        The response is closed as soon as the review array ends, which makes
+        Ollama stop generating instead of finishing the model's epilogue,
+        unless the context is kept for the next prompt of ``context_key``:
+        Ollama only returns it with the final fragment.
+        """
+        metrics = get_metrics()
+        progress = {"fragments": []}
+        fragments = self._iter_stream_fragments(response, progress)
+        try:
+            yield from iter_json_objects(fragments, outcome)
+        finally:
+            if context_key is not None and "done" not in progress:
+                try:
+                    for _ in fragments:
+                        pass
+                except requests.exceptions.RequestException:
+                    pass
+            response.close()
+            finished = time.perf_counter()
+            metrics.observe("ollama_generation", finished - started)
+            first_token_at = progress.get("first_token_at")
+            if first_token_at is not None:
+                metrics.observe("ollama_first_token", first_token_at - started)
+            if "done" in progress:
+                metrics.record_generation(self.model, progress["done"])
+                self._keep_context(context_key, progress["done"])
+            elif first_token_at is not None:
+                # Closed early: Ollama never sent its statistics, so count
+                # the streamed fragments, one token each.
+                metrics.record_generation(
+                    self.model,
+                    {
+                        "eval_count": len(progress["fragments"]),
+                        "eval_duration": (finished - first_token_at) * 1e9,
+                    },
+                )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Ollama response:\n%s", "".join(progress["fragments"]))
+
+    def review_code(self, content, filename, changed_lines, outcome=None):
+        if not self.should_review_file(filename):
+            print(f"Skipping review for unsupported file type: {filename}")
+            return []
+
+        # Fixed prompt to reduce echoing
+        prompt_template = REVIEW_CONFIG["reviewPrompt"]
+        with span("prompt_build"):
+            prompt = prompt_template.format(
+                filename=filename,
+                changed_lines=json.dumps(changed_lines),
+                content=content,
+            )
+        return self.iter_reviews(prompt, context_key=filename, outcome=outcome)
+
+    def review_segments(self, segments, outcome=None):
+        """
+        Reviews several hunks with a single generation.
+
+        Args:
+            segments (list): Dicts with ``path``, ``start``, ``end`` and
+                ``content`` keys, one per hunk.
+            outcome (dict, optional): See ``iter_reviews``.
+
+        Returns:
+            generator: Valid review dicts, see ``iter_reviews``. Each carries
+            the ``path`` the model attributed it to, which may be missing or
+            wrong.
+        """
+        with span("prompt_build"):
+            rendered = "\n\n".join(
+                f"### Segment {index}: `{segment['path']}` lines {segment['start']}-{segment['end']}\n"
+                f"{segment['content']}"
+                for index, segment in enumerate(segments, start=1)
+            )
+            prompt = REVIEW_CONFIG["packedReviewPrompt"].format(segments=rendered)
+        paths = {segment["path"] for segment in segments}
+        return self.iter_reviews(
+            prompt,
+            context_key=paths.pop() if len(paths) == 1 else None,
+            outcome=outcome,
+        )
+
+    def _generation_options(self, prompt, extra_tokens=0):
+        budget = REVIEW_CONFIG.get("tokenBudget", {})
+        num_predict = budget.get("numPredict", 1024)
+        max_ctx = budget.get("maxContextTokens", 8192)
+        needed = estimate_tokens(prompt) + extra_tokens + num_predict
+
+        num_ctx = budget.get("minContextTokens", 2048)
+        while num_ctx < needed and num_ctx < max_ctx:
+            num_ctx *= 2
+        num_ctx = min(num_ctx, max_ctx)
+        if needed > num_ctx:
+            print(f"⚠️ Prompt needs ~{needed} tokens, num_ctx capped at {num_ctx}")
+
+        return {
+            "temperature": 0.1,
+            "top_k": 10,
+            "top_p": 0.9,
+            "num_ctx": num_ctx,
+            "num_predict": num_predict,
+        }
+
+    def _build_payload(self, prompt, context_key=None):
+        """
+        Puts the review instructions in front of ``prompt``, as Ollama's
+        system prompt or as its first lines, so every review shares a
+        byte-identical prefix Ollama can keep in its KV cache. With
+        ``promptCache.reuseContext``, the context returned for the previous
+        prompt of ``context_key`` is sent along when it still fits.
+        """
+        system = REVIEW_CONFIG["reviewSystemPrompt"]
+        context = None
+        if context_key is not None and self.prompt_cache.get("reuseContext", False):
+            with self._contexts_lock:
+                context = self._contexts.get(context_key)
+        if context:
+            budget = REVIEW_CONFIG.get("tokenBudget", {})
+            needed = (
+                len(context) + estimate_tokens(prompt) + budget.get("numPredict", 1024)
+            )
+            if needed > budget.get("maxContextTokens", 8192):
+                context = None
+
+        payload = {"model": self.model, "stream": True}
+        if context:
+            # The instructions are already part of the context.
+            payload["prompt"] = prompt
+            payload["context"] = context
+            options = self._generation_options(prompt, extra_tokens=len(context))
+        else:
+            if self.prompt_cache.get("useSystemField", True):
+                payload["system"] = system
+                payload["prompt"] = prompt
+            else:
+                payload["prompt"] = f"{system}\n{prompt}"
+            options = self._generation_options(system + prompt)
+        payload["options"] = options
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+
+    def _keep_context(self, context_key, data):
+        if context_key is None or not self.prompt_cache.get("reuseContext", False):
+            return
+        with self._contexts_lock:
+            if data.get("context"):
+                self._contexts[context_key] = data["context"]
+            else:
+                self._contexts.pop(context_key, None)
+
+    def iter_reviews(self, prompt, context_key=None, outcome=None):
+        """
+        Sends ``prompt`` to Ollama and yields each valid review as soon as
+        the model has finished writing it.
+
+        Args:
+            prompt (str): Per-call part of the prompt, see ``_build_payload``.
+            context_key (str, optional): File the prompt reviews, used to
+                chain contexts with ``promptCache.reuseContext``.
+            outcome (dict, optional): ``outcome["closed"]`` is set to True
+                when the model's review array was complete. Without it, no
+                reviews does not mean no findings.
+        """
+        payload = self._build_payload(prompt, context_key)
+        logger.debug("Prompt sent to ollama:\n%s", payload["prompt"])
+        if not self.prompt_cache.get("reuseContext", False):
+            context_key = None
+
+        started = time.perf_counter()
+        response = self.make_request("/api/generate", payload)
+
+        content_type = response.headers.get("Content-Type", "")
+        if "application/json" in content_type:
+            try:
+                data = response.json()
+            finally:
+                response.close()
+            get_metrics().observe("ollama_generation", time.perf_counter() - started)
+            get_metrics().record_generation(self.model, data)
+            self._keep_context(context_key, data)
+            logger.debug("Ollama response:\n%s", data.get("response", ""))
+            parsed_reviews = iter_json_objects([data.get("response", "")], outcome)
+        else:
+            parsed_reviews = self._handle_streaming_response(
+                response, started, context_key, outcome
+            )
+
+        for review in parsed_reviews:
+            review["line"] = review.get("line")
+            review["type"] = review.get("type", "general")
+            review["severity"] = review.get("severity", "low")
+            review["message"] = str(review.get("message", "")).strip()
+
+            if review["message"]:
+                yield review
@@ -0,0 +1,349 @@
+import os
+import socket
+import threading
+import time
+
+import requests
+
+from .http_client import build_client, get_client
+
+# Import config
+from .config import REVIEW_CONFIG
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _model_name(model):
+    # Ollama reports "codellama:latest" for a model requested as "codellama".
+    return model if ":" in model else f"{model}:latest"
+
+
+class Endpoint:
+    def __init__(self, url, max_concurrency):
+        self.url = url.rstrip("/")
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.outstanding = 0
+        self.healthy = True
+        self.checked_at = 0.0
+        self.failed_at = None
+        self.loaded_models = set()
+
+    def __repr__(self):
+        return f"Endpoint({self.url}, {self.outstanding}/{self.max_concurrency})"
+
+
+class OllamaPool:
+    """
+    Spreads Ollama requests over several hosts.
+
+    Requests go to the healthy endpoint with the fewest outstanding requests
+    relative to its concurrency cap, preferring endpoints that already have
+    the model loaded. A host that errors or times out is taken out of
+    rotation for ``failure_cooldown`` seconds and the request is retried on
+    another one.
+    """
+
+    def __init__(
+        self,
+        endpoints,
+        health_check_interval=30,
+        failure_cooldown=30,
+        acquire_timeout=900,
+    ):
+        if not endpoints:
+            raise ValueError("At least one Ollama endpoint is required")
+        self.endpoints = endpoints
+        self.health_check_interval = health_check_interval
+        self.failure_cooldown = failure_cooldown
+        self.acquire_timeout = acquire_timeout
+        self.deadline = None
+        self._streams = set()
+        self._condition = threading.Condition()
+        # With a single host there is nothing to fail over to, so it is
+        # never taken out of rotation.
+        self._can_eject = len(endpoints) > 1
+        if len(endpoints) == 1:
+            self.http = get_client("ollama")
+        else:
+            # Fail over to another host instead of retrying a broken one.
+            self.http = build_client("ollama", max_retries=0)
+        self._health_http = build_client(
+            "ollama", connect_timeout=2, read_timeout=5, max_retries=0
+        )
+
+    @classmethod
+    def from_config(cls):
+        pool_config = REVIEW_CONFIG.get("ollama", {})
+        default_concurrency = pool_config.get(
+            "maxConcurrencyPerEndpoint", REVIEW_CONFIG.get("concurrencyLimit", 1)
+        )
+        hosts = os.getenv("OLLAMA_HOSTS")
+        configured = (
+            [host.strip() for host in hosts.split(",") if host.strip()]
+            if hosts
+            else pool_config.get("endpoints", ["http://127.0.0.1:11434"])
+        )
+
+        endpoints = []
+        for entry in configured:
+            if isinstance(entry, str):
+                entry = {"url": entry}
+            endpoints.append(
+                Endpoint(entry["url"], entry.get("maxConcurrency", default_concurrency))
+            )
+        return cls(
+            endpoints,
+            health_check_interval=pool_config.get("healthCheckInterval", 30),
+            failure_cooldown=pool_config.get("failureCooldown", 30),
+            acquire_timeout=pool_config.get("acquireTimeout", 900),
+        )
+
+    @property
+    def capacity(self):
+        return sum(endpoint.max_concurrency for endpoint in self.endpoints)
+
+    def check_health(self, endpoint):
+        """
+        Probes ``endpoint`` and refreshes the models it has loaded.
+        """
+        try:
+            response = self._health_http.get(f"{endpoint.url}/api/ps")
+            response.raise_for_status()
+            running = response.json()
+            if not isinstance(running, dict):
+                raise ValueError(f"unexpected /api/ps response: {running!r}")
+            loaded = {
+                model.get("name") or model.get("model")
+                for model in running.get("models", [])
+            }
+            healthy = True
+        except (requests.RequestException, ValueError) as e:
+            print(f"⚠️ Ollama endpoint {endpoint.url} is unhealthy: {e}")
+            loaded = set()
+            healthy = False
+
+        with self._condition:
+            endpoint.checked_at = time.monotonic()
+            endpoint.healthy = healthy or not self._can_eject
+            endpoint.loaded_models = loaded
+            endpoint.failed_at = None if healthy else time.monotonic()
+            self._condition.notify_all()
+        return healthy
+
+    def _refresh(self):
+        now = time.monotonic()
+        for endpoint in self.endpoints:
+            if endpoint.healthy:
+                stale = now - endpoint.checked_at > self.health_check_interval
+            else:
+                stale = now - (endpoint.failed_at or 0) > self.failure_cooldown
+            if stale and endpoint.outstanding == 0:
+                self.check_health(endpoint)
+
+    def _pick(self, model, exclude):
+        candidates = [
+            endpoint
+            for endpoint in self.endpoints
+            if endpoint.healthy
+            and endpoint not in exclude
+            and endpoint.outstanding < endpoint.max_concurrency
+        ]
+        if not candidates:
+            return None
+        wanted = _model_name(model) if model else None
+        return min(
+            candidates,
+            key=lambda endpoint: (
+                wanted not in endpoint.loaded_models,
+                endpoint.outstanding / endpoint.max_concurrency,
+            ),
+        )
+
+    def acquire(self, model=None, exclude=()):
+        """
+        Reserves a slot on the best endpoint for ``model``, waiting while
+        every healthy endpoint is at its concurrency cap, for at most
+        ``acquire_timeout`` seconds.
+        """
+        self._refresh()
+        deadline = time.monotonic() + self.acquire_timeout
+        if self.deadline is not None:
+            deadline = min(deadline, self.deadline)
+        with self._condition:
+            while True:
+                if not any(
+                    endpoint.healthy and endpoint not in exclude
+                    for endpoint in self.endpoints
+                ):
+                    raise requests.ConnectionError("No healthy Ollama endpoint")
+                endpoint = self._pick(model, exclude)
+                if endpoint is not None:
+                    endpoint.outstanding += 1
+                    return endpoint
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise requests.ConnectionError(
+                        "Timed out waiting for a free Ollama endpoint slot"
+                    )
+                self._condition.wait(remaining)
+
+    def release(self, endpoint, failed=False):
+        with self._condition:
+            endpoint.outstanding -= 1
+            if failed and self._can_eject:
+                endpoint.healthy = False
+                endpoint.failed_at = time.monotonic()
+            self._condition.notify_all()
+
+    def _release_on_close(self, response, endpoint):
+        close = response.close
+        # Popped once, even when the response is closed from two threads.
+        held = [endpoint]
+
+        def close_and_release():
+            try:
+                close()
+            finally:
+                try:
+                    held.pop()
+                except IndexError:
+                    return
+                with self._condition:
+                    self._streams.discard(response)
+                self.release(endpoint)
+
+        response.close = close_and_release
+        with self._condition:
+            self._streams.add(response)
+        if self._past_deadline():
+            self._cut(response)
+
+    def _past_deadline(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    @staticmethod
+    def _cut(response):
+        # Closing the response does not wake a thread blocked reading it;
+        # shutting the socket down makes that read fail at once.
+        connection = getattr(response.raw, "_connection", None)
+        sock = getattr(connection, "sock", None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def set_deadline(self, seconds):
+        """
+        Stops all generation ``seconds`` from now: later requests are
+        refused, read timeouts never run past the deadline, and streamed
+        generations still open then are cut short.
+        """
+        with self._condition:
+            self.deadline = time.monotonic() + seconds
+        timer = threading.Timer(seconds, self.abort)
+        timer.daemon = True
+        timer.start()
+
+    def abort(self):
+        """
+        Cuts every open streamed generation short. Their readers fail with
+        a ``requests`` error and give their endpoint slot back.
+        """
+        with self._condition:
+            streams = list(self._streams)
+        for response in streams:
+            self._cut(response)
+
+    def post(self, path, model=None, **kwargs):
+        """
+        Sends a POST to the best endpoint, failing over to the others.
+
+        With ``stream=True`` the endpoint slot of a successful response is
+        held until the caller closes it. Error responses are returned closed,
+        with their slot already given back.
+        """
+        tried = set()
+        last_error = None
+
+        while len(tried) < len(self.endpoints):
+            try:
+                endpoint = self.acquire(model, exclude=tried)
+            except requests.ConnectionError as e:
+                last_error = last_error or e
+                break
+            tried.add(endpoint)
+
+            try:
+                response = self.http.post(
+                    f"{endpoint.url}{path}", deadline=self.deadline, **kwargs
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if self._past_deadline():
+                    # Not the endpoint's fault: the run is out of time.
+                    self.release(endpoint)
+                    raise
+                print(f"⚠️ Ollama endpoint {endpoint.url} failed: {e}")
+                self.release(endpoint, failed=True)
+                last_error = e
+                continue
+
+            if response.status_code >= 500 and len(tried) < len(self.endpoints):
+                print(
+                    f"⚠️ Ollama endpoint {endpoint.url} returned "
+                    f"{response.status_code}, trying another"
+                )
+                response.close()
+                self.release(endpoint, failed=True)
+                continue
+
+            if not response.ok:
+                # Callers only look at the status of an error response.
+                response.close()
+                self.release(endpoint)
+                return response
+
+            if model:
+                endpoint.loaded_models.add(_model_name(model))
+            if kwargs.get("stream"):
+                self._release_on_close(response, endpoint)
+            else:
+                self.release(endpoint)
+            return response
+
+        raise last_error or requests.ConnectionError("No Ollama endpoint available")
+
+    def broadcast(self, path, model=None, **kwargs):
+        """
+        Sends a POST to every healthy endpoint, e.g. to load or unload a
+        model everywhere. Returns the number of endpoints that accepted it.
+        """
+        self._refresh()
+        accepted = 0
+        for endpoint in [e for e in self.endpoints if e.healthy]:
+            try:
+                response = self.http.post(f"{endpoint.url}{path}", **kwargs)
+                response.raise_for_status()
+            except requests.RequestException as e:
+                print(f"⚠️ Ollama endpoint {endpoint.url} failed: {e}")
+                continue
+            accepted += 1
+            if model:
+                if kwargs.get("json", {}).get("keep_alive") == 0:
+                    endpoint.loaded_models.discard(_model_name(model))
+                else:
+                    endpoint.loaded_models.add(_model_name(model))
+        return accepted
+
+
+def get_pool():
+    """
+    Returns the shared pool built from ``REVIEW_CONFIG["ollama"]`` or the
+    ``OLLAMA_HOSTS`` environment variable.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = OllamaPool.from_config()
+        return _pool
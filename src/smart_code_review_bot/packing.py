@@ -0,0 +1,183 @@
+def estimate_tokens(text):
+    # Code averages roughly four characters per token for Llama-style
+    # tokenizers; close enough to budget prompts without loading one.
+    return len(text) // 4 + 1
+
+
+def make_segment(path, lines):
+    """
+    Builds a reviewable segment from numbered lines.
+
+    Args:
+        path (str): Path of the file the lines belong to.
+        lines (DiffLines): The lines, as produced by ``get_changed_lines``;
+            added lines are tagged [CHANGED] in the prompt.
+
+    Returns:
+        dict: Segment with ``path``, ``lines``, ``added_lines``, ``start``,
+        ``end`` and rendered ``content`` keys.
+    """
+    return {
+        "path": path,
+        "lines": lines,
+        "added_lines": lines.added_lines(),
+        "start": lines.start,
+        "end": lines.end,
+        "content": lines.render(),
+    }
+
+
+def _is_boundary(content):
+    # Blank lines and top-level statements are where code splits cleanly.
+    return not content.strip() or not content[:1].isspace()
+
+
+def split_segment(segment, max_tokens, overlap_lines=3):
+    """
+    Splits a segment whose estimated size exceeds ``max_tokens``.
+
+    Cuts are made at the last blank or unindented line of the second half of
+    each piece when there is one. Every piece after the first repeats the last
+    ``overlap_lines`` lines of the previous one as untagged context, so each
+    added line is reviewed exactly once.
+
+    Args:
+        segment (dict): Segment built by ``make_segment``.
+        max_tokens (int): Estimated token budget for one piece.
+        overlap_lines (int): Lines of context shared between pieces.
+
+    Returns:
+        list: The pieces, or ``[segment]`` when it already fits.
+    """
+    if estimate_tokens(segment["content"]) <= max_tokens:
+        return [segment]
+
+    lines = segment["lines"]
+    texts = lines.texts
+    pieces = []
+    start = 0
+    owned_from = 0
+
+    while start < len(texts):
+        tokens = 0
+        end = start
+        while end < len(texts):
+            line_tokens = estimate_tokens(texts[end]) + 3
+            if end > start and tokens + line_tokens > max_tokens:
+                break
+            tokens += line_tokens
+            end += 1
+
+        if end < len(texts):
+            midpoint = start + (end - start) // 2
+            for cut in range(end - 1, midpoint, -1):
+                if _is_boundary(texts[cut]):
+                    end = cut
+                    break
+
+        pieces.append(
+            make_segment(segment["path"], lines.slice(start, end, owned_from))
+        )
+        if end >= len(texts):
+            break
+        owned_from = end
+        start = max(end - overlap_lines, start + 1)
+
+    return pieces
+
+
+def pack_segments(segments, max_tokens, max_segments=12, cross_file=True):
+    """
+    Bins hunk segments into groups that each fit one review prompt.
+
+    Segments are packed greedily in diff order. A segment larger than
+    ``max_tokens`` gets a group of its own.
+
+    Args:
+        segments (list): Dicts with ``path`` and ``content`` keys.
+        max_tokens (int): Estimated token budget for the code of one prompt.
+        max_segments (int): Maximum number of segments per prompt.
+        cross_file (bool): Whether segments of different files may share a
+            prompt.
+
+    Returns:
+        list: Lists of segments, in diff order.
+    """
+    packs = []
+    current = []
+    current_tokens = 0
+
+    for segment in segments:
+        tokens = estimate_tokens(segment["content"])
+        if current and (
+            current_tokens + tokens > max_tokens
+            or len(current) >= max_segments
+            or (not cross_file and current[-1]["path"] != segment["path"])
+        ):
+            packs.append(current)
+            current = []
+            current_tokens = 0
+        current.append(segment)
+        current_tokens += tokens
+
+    if current:
+        packs.append(current)
+    return packs
+
+
+def _as_line(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def demux_reviews(pack, reviews):
+    """
+    Routes the reviews of a packed prompt back to the segments they are
+    about.
+
+    A review is matched on its ``path`` and must point at one of the
+    segment's added lines. Reviews on other lines of a known file become
+    general comments of that file; reviews that match no segment at all are
+    dropped.
+
+    Args:
+        pack (list): The segments that were reviewed together.
+        reviews (iterable): Review dicts from ``OllamaAPI.review_segments``,
+            routed one by one while the model is still generating.
+
+    Returns:
+        list: One list of review dicts per segment, in pack order.
+    """
+    routed = [[] for _ in pack]
+
+    for review in reviews:
+        path = review.pop("path", None)
+        candidates = [i for i, segment in enumerate(pack) if segment["path"] == path]
+        if not candidates:
+            candidates = list(range(len(pack)))
+
+        line = _as_line(review.get("line"))
+        target = None
+        if line is not None:
+            for i in candidates:
+                if line in pack[i]["added_lines"]:
+                    target = i
+                    break
+
+        if target is not None:
+            review["line"] = line
+        elif path is not None and path in {pack[i]["path"] for i in candidates}:
+            target = candidates[0]
+            review["line"] = None
+        elif len(pack) == 1:
+            target = 0
+            review["line"] = None
+        else:
+            print(f"Dropping review that matches no segment: {review}")
+            continue
+
+        routed[target].append(review)
+
+    return routed
@@ -0,0 +1,278 @@
+import argparse
+import os
+
+from . import doc_string
+from . import main as review
+from . import unittest_suggest
+from .file_source import get_source
+from .generation_cache import GenerationCache
+from .git_diff import collect_sources, extension_pathspecs
+from .github import GitHubAPI
+from .metrics import configure_logging, get_metrics
+from .model_scheduler import ModelScheduler
+from .ollama import OllamaAPI
+from .review_cache import ReviewCache
+
+# Import config
+from .config import REVIEW_CONFIG
+
+STAGES = ("review", "unittest", "docstring")
+
+
+def schedule_review(
+    scheduler, files, keep_alive, review_cache, paths=(), state=None, budget=None
+):
+    """
+    Queues the review prompts of ``files`` and returns a callable that posts
+    the collected findings once the scheduler has run. ``files`` is read
+    once, lazily. With a ``budget``, prompts are queued riskiest first and
+    the hunks it leaves out are listed in the review.
+    """
+    ollama = OllamaAPI(keep_alive=keep_alive)
+    current_hunks = {}
+    entries, results, packs = review.prepare_review(
+        review.track_hunks(files, current_hunks),
+        ollama,
+        review_cache,
+        review.make_hunk_filter(paths, state),
+        budget,
+    )
+
+    for pack in packs:
+        scheduler.submit(
+            ollama.model,
+            review.review_pack,
+            pack,
+            ollama,
+            review_cache,
+            callback=lambda result, error, pack=pack: review.record_pack_findings(
+                results, pack, result, error=error, budget=budget
+            ),
+        )
+
+    def finish():
+        review.finish_review(
+            GitHubAPI(review.GITHUB_TOKEN),
+            (),
+            [(path, key, findings) for (path, key), findings in zip(entries, results)],
+            state,
+            paths,
+            review.get_head_sha(),
+            current_hunks,
+            note=budget.note() if budget is not None else "",
+        )
+
+    return finish
+
+
+def schedule_unittest(scheduler, sources, keep_alive, cache=None):
+    """
+    Queues a unit test suggestion for every new function in ``sources`` not
+    found in ``cache`` and returns a callable that posts them once the
+    scheduler has run.
+    """
+    ollama = unittest_suggest.OllamaAPI(keep_alive=keep_alive, cache=cache)
+    suggestions, jobs = unittest_suggest.plan_suggestions(ollama, sources)
+
+    for file_path, name, code_snippet, cache_key in jobs:
+
+        def record(result, error, name=name, target=suggestions[file_path]):
+            if error is not None:
+                print(f"Failed to generate test for `{name}`: {error}")
+            else:
+                target[name] = result
+
+        scheduler.submit(
+            ollama.model,
+            ollama.suggest_unittest,
+            code_snippet,
+            cache_key=cache_key,
+            callback=record,
+        )
+
+    def finish():
+        unittest_suggest.post_test_summary(suggestions)
+
+    return finish
+
+
+def schedule_docstrings(scheduler, sources, keep_alive, cache=None):
+    """
+    Queues a docstring for every undocumented changed function in
+    ``sources`` not found in ``cache`` and returns a callable that writes
+    them once the scheduler has run.
+    """
+    ollama = doc_string.OllamaAPI(keep_alive=keep_alive, cache=cache)
+    pending = []
+
+    for file_path, parsed in sources.items():
+        print(f"📝 Running docstring generator on {file_path}")
+        found = ollama.find_docstring_targets(
+            file_path,
+            source=parsed["source"],
+            tree=parsed["tree"],
+            changed_lines=set(parsed["added_lines"]),
+        )
+        if found is None:
+            continue
+        current_source, targets = found
+        if not targets:
+            continue
+        docstrings = ollama.cached_docstrings(targets)
+        pending.append((file_path, current_source, targets, docstrings))
+        print(f"🔍 Generating docstrings for: {', '.join(t['name'] for t in targets)}")
+
+        for batch in ollama.batch_targets(targets, skip=docstrings):
+
+            def record(result, error, docstrings=docstrings):
+                if error is not None:
+                    print(f"❌ Docstring batch failed: {error}")
+                else:
+                    docstrings.update(result)
+
+            scheduler.submit(
+                ollama.model, ollama.generate_batch, targets, batch, callback=record
+            )
+
+    def finish():
+        for file_path, current_source, targets, docstrings in pending:
+            ollama.insert_docstrings(
+                file_path,
+                current_source,
+                [
+                    (target, docstrings[i])
+                    for i, target in enumerate(targets)
+                    if docstrings.get(i)
+                ],
+            )
+
+    return finish
+
+
+def diff_pathspecs(stages):
+    """
+    Returns the git pathspecs of the files ``stages`` read: the extensions
+    the review supports, and Python files for the AST based stages.
+    """
+    if "review" not in stages:
+        return ["*.py"]
+    pathspecs = extension_pathspecs(REVIEW_CONFIG.get("supportedExtensions"))
+    # An empty list means every file already.
+    if pathspecs and "*.py" not in pathspecs:
+        if "unittest" in stages or "docstring" in stages:
+            pathspecs.append("*.py")
+    return pathspecs
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="smart-code-review-bot",
+        description="Review a pull request, suggest unit tests and generate "
+        "docstrings in a single run",
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        help="Only process these files (default: every changed file)",
+    )
+    parser.add_argument(
+        "--stages",
+        default=",".join(STAGES),
+        help=f"Comma separated stages to run (default: {','.join(STAGES)})",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        default=os.getenv("REVIEW_MODE") == "incremental",
+        help="Only review hunks not covered by a previous run on this PR",
+    )
+    review.add_budget_arguments(parser)
+    review.add_checkout_argument(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging()
+    # Started first so the deadline covers the whole run.
+    budget = review.start_budget(args)
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise SystemExit(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+    if args.no_checkout:
+        review.use_github_files(GitHubAPI(review.GITHUB_TOKEN))
+        if "docstring" in stages:
+            print("Skipping docstring stage: it writes to a checkout")
+            stages.remove("docstring")
+
+    state = None
+    if "review" in stages and args.incremental:
+        state = review.load_review_state(
+            GitHubAPI(review.GITHUB_TOKEN), review.get_head_sha(), args.paths
+        )
+        if state is None:
+            stages.remove("review")
+
+    # The diff is streamed once, one file at a time, through the review
+    # stage; the Python files the other stages need are parsed on the way.
+    files = get_source().iter_diff(
+        args.paths, diff_filter="d", pathspecs=diff_pathspecs(stages)
+    )
+    sources = {}
+    if "unittest" in stages or "docstring" in stages:
+        files = collect_sources(files, sources, args.paths, read=get_source().read)
+
+    scheduler = ModelScheduler(budget=budget)
+    review_cache = ReviewCache.from_config() if "review" in stages else None
+    generation_cache = None
+    if "unittest" in stages or "docstring" in stages:
+        generation_cache = GenerationCache.from_config()
+    finishers = []
+
+    try:
+        if "review" in stages:
+            finishers.append(
+                schedule_review(
+                    scheduler,
+                    files,
+                    scheduler.keep_alive,
+                    review_cache,
+                    paths=args.paths,
+                    state=state,
+                    budget=budget,
+                )
+            )
+        elif "unittest" in stages or "docstring" in stages:
+            # Without the review nothing else reads the diff.
+            for _ in files:
+                pass
+        if "unittest" in stages:
+            finishers.append(
+                schedule_unittest(
+                    scheduler, sources, scheduler.keep_alive, generation_cache
+                )
+            )
+        if "docstring" in stages:
+            finishers.append(
+                schedule_docstrings(
+                    scheduler, sources, scheduler.keep_alive, generation_cache
+                )
+            )
+
+        scheduler.run()
+    finally:
+        if review_cache is not None:
+            review_cache.close()
+        if generation_cache is not None:
+            generation_cache.close()
+
+    for finish in finishers:
+        finish()
+
+    get_metrics().finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import fnmatch
+import math
+import os
+import time
+
+from .packing import estimate_tokens
+
+# Import config
+from .config import REVIEW_CONFIG
+
+MAX_LISTED_SKIPS = 30
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+class ReviewBudget:
+    """
+    Wall-clock and prompt token budget of a review run.
+
+    Hunks are ranked by a risk score so the riskiest are reviewed first:
+    security-sensitive paths weigh most, then the language weight of the
+    file, the size of the hunk and the churn of its file. Prompts that do
+    not fit the token budget, or have not finished by the deadline, are
+    recorded in ``skipped`` so the posted review can list them.
+    """
+
+    def __init__(
+        self,
+        seconds=None,
+        prompt_tokens=None,
+        sensitive_paths=(),
+        language_weights=None,
+    ):
+        self.deadline = time.perf_counter() + seconds if seconds else None
+        self.prompt_tokens = prompt_tokens
+        self.sensitive_paths = tuple(sensitive_paths)
+        self.language_weights = language_weights or {}
+        self.spent_tokens = 0
+        self.skipped = []
+
+    @classmethod
+    def from_config(cls, seconds=None, prompt_tokens=None):
+        """
+        Builds the budget described by ``REVIEW_CONFIG["reviewBudget"]``,
+        with ``seconds`` and ``prompt_tokens`` taking precedence. Returns None
+        when there is no budget at all.
+        """
+        budget_config = REVIEW_CONFIG.get("reviewBudget", {})
+        seconds = seconds or budget_config.get("seconds")
+        prompt_tokens = prompt_tokens or budget_config.get("promptTokens")
+        if not seconds and not prompt_tokens:
+            return None
+        return cls(
+            seconds=seconds,
+            prompt_tokens=prompt_tokens,
+            sensitive_paths=budget_config.get("sensitivePaths", ()),
+            language_weights=budget_config.get("languageWeights"),
+        )
+
+    def score(self, file, hunk):
+        path = file.path.lower()
+        extension = os.path.splitext(path)[1].lstrip(".")
+        sensitive = any(
+            fnmatch.fnmatch(path, pattern) for pattern in self.sensitive_paths
+        )
+        return self.language_weights.get(extension, 1.0) * (
+            1.0
+            + (3.0 if sensitive else 0.0)
+            + math.log1p(hunk.added)
+            + math.log1p(file.added + file.removed) / 2
+        )
+
+    def rank(self, segments):
+        """
+        Orders ``segments`` riskiest first by the ``score`` that
+        ``iter_pending`` stored on them. Ties keep diff order.
+        """
+        return sorted(segments, key=lambda segment: -segment["score"])
+
+    def admit(self, pack):
+        """
+        Charges ``pack`` to the token budget, or records it as skipped and
+        returns False when it does not fit.
+        """
+        tokens = sum(estimate_tokens(segment["content"]) for segment in pack)
+        if self.prompt_tokens and self.spent_tokens + tokens > self.prompt_tokens:
+            self.skip(pack)
+            return False
+        self.spent_tokens += tokens
+        return True
+
+    def remaining(self):
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.perf_counter())
+
+    def expired(self):
+        return self.deadline is not None and time.perf_counter() >= self.deadline
+
+    def check(self):
+        if self.expired():
+            raise BudgetExceeded("review time budget exhausted")
+
+    def skip(self, pack):
+        for segment in pack:
+            hunk = (segment["path"], segment["start"], segment["end"])
+            if hunk not in self.skipped:
+                self.skipped.append(hunk)
+
+    def note(self):
+        """
+        Returns the Markdown list of skipped hunks for the review body, or
+        an empty string when every hunk was reviewed.
+        """
+        if not self.skipped:
+            return ""
+        lines = [
+            "### Not reviewed",
+            "",
+            f"The review budget ran out before {len(self.skipped)} hunks were "
+            "reviewed (riskiest first):",
+            "",
+        ]
+        lines += [
+            f"- `{path}` lines {start}-{end}"
+            for path, start, end in self.skipped[:MAX_LISTED_SKIPS]
+        ]
+        if len(self.skipped) > MAX_LISTED_SKIPS:
+            lines.append(f"- … and {len(self.skipped) - MAX_LISTED_SKIPS} more")
+        return "\n".join(lines)
@@ -0,0 +1,89 @@
+import hashlib
+import json
+
+# Import config
+from .config import REVIEW_CONFIG
+from .sqlite_cache import SQLiteCache
+
+
+class ReviewCache(SQLiteCache):
+    """
+    On-disk SQLite cache of parsed Ollama reviews.
+
+    Entries are keyed by a hash of the model, the review prompt template, the
+    filename and the hunk text. Line numbers are stored relative to the first
+    line of the hunk, so a hunk that only moved still hits.
+    """
+
+    filename = "reviews.sqlite3"
+    table = "reviews"
+    columns = """
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        last_used_at REAL NOT NULL
+    """
+    config_section = "cache"
+    label = "Review cache"
+
+    def __init__(
+        self, directory, max_entries=5000, max_bytes=50_000_000, max_age_days=30
+    ):
+        super().__init__(
+            directory, max_entries, max_bytes, max_age=max_age_days * 24 * 60 * 60
+        )
+
+    @staticmethod
+    def make_key(model, filename, lines):
+        """
+        Hashes everything that can change a review of a hunk.
+
+        Args:
+            model (str): Ollama model name.
+            filename (str): Path of the reviewed file.
+            lines (DiffLines): ``get_changed_lines(hunk)``.
+
+        Returns:
+            tuple: ``(key, base_line)`` where ``base_line`` is the first line
+            number of the hunk, used to rebase cached line numbers.
+        """
+        base_line = lines.start
+        digest = hashlib.sha256()
+        for part in (
+            model,
+            REVIEW_CONFIG["reviewSystemPrompt"],
+            REVIEW_CONFIG["reviewPrompt"],
+            filename,
+        ):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        for line_num, flag, text in lines:
+            line_type = "add" if flag else "normal"
+            digest.update(
+                f"{line_num - base_line}:{line_type}:{text.strip()}\n".encode("utf-8")
+            )
+        return digest.hexdigest(), base_line
+
+    def get(self, key, base_line):
+        row = self._lookup(key, "value")
+        if row is None:
+            return None
+
+        reviews = json.loads(row[0])
+        for review in reviews:
+            if review.get("line") is not None:
+                review["line"] += base_line
+        return reviews
+
+    def put(self, key, base_line, reviews):
+        stored = []
+        for review in reviews:
+            review = dict(review)
+            try:
+                review["line"] = int(review["line"]) - base_line
+            except (KeyError, TypeError, ValueError):
+                review["line"] = None
+            stored.append(review)
+        value = json.dumps(stored)
+        self._store(key, len(value), value=value)
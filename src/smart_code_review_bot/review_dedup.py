@@ -0,0 +1,105 @@
+import hashlib
+import re
+
+FINDING_PATTERN = re.compile(
+    r":thought_balloon: \*\*[^*\n]+\*\* \([^)\n]*\)\n\n(.*?)(?=\n\n:thought_balloon: |\Z)",
+    re.DOTALL,
+)
+
+
+def format_finding(finding):
+    return (
+        f":thought_balloon: **{finding['type'].upper()}** ({finding['severity']})"
+        f"\n\n{finding['message']}"
+    )
+
+
+def fingerprint(message):
+    """
+    Hashes a review message with case, punctuation and whitespace dropped,
+    so a finding re-worded only in formatting still matches.
+    """
+    normalized = " ".join(re.sub(r"[\W_]+", " ", message.lower()).split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+class CommentIndex:
+    """
+    Hashed index of the bot's inline comments already on a pull request.
+
+    Findings are keyed on ``(path, line, fingerprint(message))``, and the
+    comment at each ``(path, line)`` is kept so new findings on a line the
+    bot already commented on can be added to that comment instead of
+    opening a new thread.
+    """
+
+    def __init__(self, comments=()):
+        self.findings = set()
+        self.by_location = {}
+        for comment in comments:
+            self.add(comment)
+
+    @classmethod
+    def load(cls, github, owner, repo, pr_number):
+        comments = github.get_existing_comments(owner, repo, pr_number)
+        # Only the bot's own comments: it appends to them in place.
+        index = cls(
+            comment
+            for comment in comments
+            if FINDING_PATTERN.search(comment.get("body") or "")
+            and github.is_own_comment(comment)
+        )
+        print(
+            f"Indexed {len(index.findings)} existing findings "
+            f"from {len(comments)} review comments"
+        )
+        return index
+
+    def add(self, comment):
+        body = comment.get("body") or ""
+        messages = FINDING_PATTERN.findall(body)
+        # Outdated comments have no line; they point at code that is gone.
+        if not messages or comment.get("line") is None:
+            return
+        location = (comment.get("path"), comment["line"])
+        self.by_location.setdefault(location, comment)
+        for message in messages:
+            self.findings.add(location + (fingerprint(message),))
+
+    def dedupe(self, findings):
+        """
+        Drops inline findings that are already posted.
+
+        Args:
+            findings (list): Review dicts with ``path``, ``line`` and
+                ``message`` keys. General comments (``line`` None) are kept.
+
+        Returns:
+            tuple: ``(findings, updates)`` where ``findings`` still need to
+            be posted and ``updates`` maps an existing comment to the new
+            findings to append to it, as ``{comment_id: (comment, [finding])}``.
+        """
+        remaining = []
+        updates = {}
+        dropped = 0
+
+        for finding in findings:
+            if finding.get("line") is None:
+                remaining.append(finding)
+                continue
+            location = (finding["path"], finding["line"])
+            key = location + (fingerprint(finding["message"]),)
+            if key in self.findings:
+                dropped += 1
+                continue
+            self.findings.add(key)
+
+            comment = self.by_location.get(location)
+            if comment is None:
+                remaining.append(finding)
+            else:
+                updates.setdefault(comment["id"], (comment, []))[1].append(finding)
+
+        if dropped:
+            print(f"Skipping {dropped} findings already posted on this PR")
+        return remaining, updates
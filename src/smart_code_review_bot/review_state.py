@@ -0,0 +1,114 @@
+import hashlib
+import json
+import re
+
+STATE_MARKER = "<!-- smart-code-review:state"
+STATE_PATTERN = re.compile(r"<!-- smart-code-review:state (.*?) -->", re.DOTALL)
+
+
+def hunk_id(path, hunk):
+    """
+    Computes a patch-id style fingerprint of a hunk.
+
+    Only the path and the added/removed lines are hashed, with whitespace
+    dropped and line numbers and context ignored, so the same change keeps
+    its id across rebases and force-pushes.
+
+    Args:
+        path (str): Path of the file the hunk belongs to.
+        hunk (unidiff.Hunk): The hunk to fingerprint.
+
+    Returns:
+        str: A short hex digest.
+    """
+    digest = hashlib.sha1(path.encode("utf-8"))
+    for line in hunk:
+        if line.is_added or line.is_removed:
+            digest.update(line.line_type.encode("utf-8"))
+            digest.update("".join(line.value.split()).encode("utf-8"))
+            digest.update(b"\n")
+    return digest.hexdigest()[:16]
+
+
+class ReviewState:
+    """
+    Review progress of a pull request, persisted as a hidden marker in a
+    bot-owned PR comment so it survives across workflow runs.
+
+    Reviewed ``hunk_id`` values are kept per file, so a run restricted to
+    some paths only prunes the hunks of those paths.
+    """
+
+    def __init__(self, sha=None, files=None, comment_id=None):
+        self.sha = sha
+        self.files = {path: set(ids) for path, ids in (files or {}).items()}
+        self.comment_id = comment_id
+
+    @classmethod
+    def load(cls, github, owner, repo, pr_number):
+        for comment in github.get_issue_comments(owner, repo, pr_number):
+            match = STATE_PATTERN.search(comment.get("body") or "")
+            # Anyone can post a marker listing their own hunks as reviewed.
+            if not match or not github.is_own_comment(comment):
+                continue
+            try:
+                data = json.loads(match.group(1))
+            except json.JSONDecodeError:
+                print("⚠️ Ignoring unreadable review state marker")
+                return cls(comment_id=comment["id"])
+            return cls(data.get("sha"), data.get("files"), comment["id"])
+        return cls()
+
+    def __len__(self):
+        return sum(len(ids) for ids in self.files.values())
+
+    def is_reviewed(self, path, hunk_key):
+        return hunk_key in self.files.get(path, ())
+
+    def update(self, current, reviewed, whole_diff=True):
+        """
+        Records the hunks reviewed by a run and forgets those no longer part
+        of the pull request, so the marker only ever describes the diff.
+
+        Args:
+            current (dict): Path to ``hunk_id`` set of every hunk the run
+                read.
+            reviewed (dict): Path to ``hunk_id`` set of the hunks it
+                reviewed.
+            whole_diff (bool): Whether ``current`` covers the whole diff.
+                Otherwise files that were not read are left alone.
+        """
+        if whole_diff:
+            self.files = {
+                path: ids for path, ids in self.files.items() if path in current
+            }
+        for path, ids in current.items():
+            kept = (self.files.get(path, set()) & ids) | reviewed.get(path, set())
+            if kept:
+                self.files[path] = kept
+            else:
+                self.files.pop(path, None)
+
+    def render(self):
+        data = json.dumps(
+            {
+                "sha": self.sha,
+                "files": {
+                    path: sorted(ids) for path, ids in sorted(self.files.items())
+                },
+            }
+        )
+        short_sha = (self.sha or "")[:7]
+        return (
+            f"🤖 Smart Code Review has reviewed this pull request up to `{short_sha}`.\n"
+            f"{STATE_MARKER} {data} -->"
+        )
+
+    def save(self, github, owner, repo, pr_number):
+        body = self.render()
+        if self.comment_id is None:
+            response = github.post_comment(owner, repo, pr_number, body)
+            self.comment_id = response.get("id")
+        else:
+            github.update_issue_comment(owner, repo, self.comment_id, body)
+        print(f"Saved review state at {self.sha} ({len(self)} hunks)")
@@ -0,0 +1,161 @@
+import os
+import sqlite3
+import threading
+import time
+
+# Import config
+from .config import REVIEW_CONFIG
+
+
+def cache_directory():
+    """
+    Returns the directory holding the on-disk caches: ``REVIEW_CACHE_DIR``
+    or ``REVIEW_CONFIG["cache"]["directory"]``.
+    """
+    return os.path.expanduser(
+        os.getenv("REVIEW_CACHE_DIR")
+        or REVIEW_CONFIG.get("cache", {}).get("directory", "~/.cache/smart-code-review")
+    )
+
+
+class SQLiteCache:
+    """
+    One SQLite table in the cache directory, evicted least recently used
+    first once it exceeds ``max_entries`` rows or ``max_bytes``.
+
+    Subclasses name the ``filename``, ``table`` and its ``columns``. Every
+    table has ``key``, ``size`` and ``last_used_at`` columns, plus a
+    ``created_at`` column when entries expire after ``max_age`` seconds.
+    """
+
+    filename = None
+    table = None
+    columns = None
+    # Section of REVIEW_CONFIG read by from_config, and the name in messages
+    config_section = None
+    label = None
+
+    def __init__(self, directory, max_entries, max_bytes, max_age=None):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, self.filename)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS {self.table} ({self.columns})")
+        self._conn.commit()
+
+    @classmethod
+    def from_config(cls):
+        """
+        Builds the cache described by ``REVIEW_CONFIG[cls.config_section]``
+        in the cache directory, or returns None when it is disabled.
+        """
+        cache_config = REVIEW_CONFIG.get(cls.config_section, {})
+        if not cache_config.get("enabled", True):
+            return None
+        limits = {
+            name: cache_config[option]
+            for option, name in (
+                ("maxEntries", "max_entries"),
+                ("maxSizeBytes", "max_bytes"),
+                ("maxAgeDays", "max_age_days"),
+            )
+            if option in cache_config
+        }
+        try:
+            return cls(cache_directory(), **limits)
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️ {cls.label} disabled: {e}")
+            return None
+
+    def _row(self, key, columns):
+        """
+        Returns the ``columns`` of the entry for ``key``, or None when there
+        is none or it has expired.
+        """
+        if self.max_age is not None:
+            columns += ", created_at"
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {columns} FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or self.max_age is None:
+            return row
+        if time.time() - row[-1] > self.max_age:
+            return None
+        return row[:-1]
+
+    def _lookup(self, key, columns):
+        """
+        Like ``_row``, but counts a hit or a miss and marks a hit as used.
+        """
+        row = self._row(key, columns)
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        self.touch(key)
+        return row
+
+    def touch(self, key):
+        """
+        Marks the entry for ``key`` as just used and counts a hit.
+        """
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE {self.table} SET last_used_at = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            self._conn.commit()
+            self.hits += 1
+
+    def _store(self, key, size, **values):
+        now = time.time()
+        values = {"key": key, **values, "size": size, "last_used_at": now}
+        if self.max_age is not None:
+            values["created_at"] = now
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} ({', '.join(values)}) "
+                f"VALUES ({', '.join('?' for _ in values)})",
+                tuple(values.values()),
+            )
+            self._conn.commit()
+
+    def evict(self):
+        """
+        Drops expired entries, then the least recently used ones until the
+        cache fits ``max_entries`` and ``max_bytes``.
+        """
+        with self._lock:
+            if self.max_age is not None:
+                self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE created_at < ?",
+                    (time.time() - self.max_age,),
+                )
+            count, total = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+            ).fetchone()
+            if count > self.max_entries or total > self.max_bytes:
+                rows = self._conn.execute(
+                    f"SELECT key, size FROM {self.table} ORDER BY last_used_at ASC"
+                ).fetchall()
+                stale = []
+                for key, size in rows:
+                    if count <= self.max_entries and total <= self.max_bytes:
+                        break
+                    stale.append((key,))
+                    count -= 1
+                    total -= size
+                self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", stale)
+            self._conn.commit()
+
+    def close(self):
+        self.evict()
+        with self._lock:
+            self._conn.close()
+        print(f"{self.label}: {self.hits} hits, {self.misses} misses")
@@ -0,0 +1,87 @@
+import json
+
+_SCAN, _ARRAY_START, _ARRAY, _OBJECT = range(4)
+
+
+def _load(text):
+    try:
+        value = json.loads(text)
+    except json.JSONDecodeError:
+        print(f"Skipping invalid JSON object: {text}")
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def iter_json_objects(fragments, outcome=None):
+    """
+    Yields the objects of a JSON array as soon as each one is complete.
+
+    Text around the array, such as model chatter or markdown code fences, is
+    ignored. Iteration stops as soon as the top-level array is closed, so the
+    caller can drop the rest of the stream. Objects outside any array are
+    yielded too, for models that forget the brackets.
+
+    Args:
+        fragments (iterable): Pieces of text in stream order.
+        outcome (dict, optional): ``outcome["closed"]`` is set to True when
+            the top-level array was closed, i.e. the answer was complete.
+
+    Yields:
+        dict: Each decoded object.
+    """
+    state = _SCAN
+    in_array = False
+    depth = 0
+    in_string = False
+    escape = False
+    buffer = []
+
+    for fragment in fragments:
+        for char in fragment:
+            if state == _OBJECT:
+                buffer.append(char)
+                if in_string:
+                    if escape:
+                        escape = False
+                    elif char == "\\":
+                        escape = True
+                    elif char == '"':
+                        in_string = False
+                elif char == '"':
+                    in_string = True
+                elif char == "{":
+                    depth += 1
+                elif char == "}":
+                    depth -= 1
+                    if depth == 0:
+                        value = _load("".join(buffer))
+                        buffer = []
+                        if value is not None:
+                            yield value
+                        state = _ARRAY if in_array else _SCAN
+            elif state == _SCAN:
+                if char == "[":
+                    state = _ARRAY_START
+                elif char == "{":
+                    state, depth, buffer = _OBJECT, 1, [char]
+            elif state == _ARRAY_START:
+                # A "[" only opens the review array when an object or the
+                # closing bracket follows; otherwise it was prose.
+                if char.isspace() or char == "[":
+                    continue
+                if char == "{":
+                    in_array = True
+                    state, depth, buffer = _OBJECT, 1, [char]
+                elif char == "]":
+                    if outcome is not None:
+                        outcome["closed"] = True
+                    return
+                else:
+                    state = _SCAN
+            elif state == _ARRAY:
+                if char == "{":
+                    state, depth, buffer = _OBJECT, 1, [char]
+                elif char == "]":
+                    if outcome is not None:
+                        outcome["closed"] = True
+                    return
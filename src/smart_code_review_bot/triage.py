@@ -0,0 +1,302 @@
+import ast
+import fnmatch
+import io
+import os
+import re
+import tokenize
+
+from .file_source import get_source
+
+# Import config
+from .config import REVIEW_CONFIG
+
+VENDORED_PATTERNS = (
+    "vendor/*",
+    "*/vendor/*",
+    "third_party/*",
+    "*/third_party/*",
+    "node_modules/*",
+    "*/node_modules/*",
+    "dist/*",
+    "build/*",
+)
+GENERATED_PATTERNS = (
+    "*.min.js",
+    "*.min.css",
+    "*.bundle.js",
+    "*_pb2.py",
+    "*_pb2_grpc.py",
+    "*.pb.go",
+    "*.generated.*",
+    "*_generated.*",
+)
+GENERATED_MARKERS = re.compile(
+    r"@generated|DO NOT EDIT|Code generated by|\bauto-?generated\b", re.IGNORECASE
+)
+# Lines that may start the comment block at the top of a file.
+HEADER_COMMENT_PREFIXES = ("#", "//", "/*", "*", "<!--", "--")
+LINE_COMMENT_PREFIXES = {".py": ("#",), ".rb": ("#",), ".php": ("//", "#")}
+# Extensions without ``/* ... */`` comments.
+NO_BLOCK_COMMENTS = {".py", ".rb"}
+# Outside Python, whitespace only separates tokens: string literals, runs of
+# operator characters and line breaks are kept.
+C_TOKEN = re.compile(
+    r""""(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`|\w+|[^\w\s]+"""
+)
+VERSION_LINE = re.compile(
+    r"""^\s*["']?(__version__|version|VERSION)["']?\s*[=:]\s*["'][\w.+-]+["'],?\s*$"""
+)
+IMPORT_LINE = re.compile(r"^\s*(import\s|from\s+\S+\s+import\s)")
+DOCUMENTED_NODES = (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+# INDENT, DEDENT and NEWLINE are kept: they carry the block structure and
+# the end of each statement.
+IGNORED_TOKENS = {tokenize.COMMENT, tokenize.NL, tokenize.ENDMARKER}
+
+
+def _matches(path, patterns):
+    name = os.path.basename(path)
+    return any(
+        fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(name, pattern)
+        for pattern in patterns
+    )
+
+
+def _changed(hunk):
+    removed = [line.value.rstrip("\n") for line in hunk if line.is_removed]
+    added = [line.value.rstrip("\n") for line in hunk if line.is_added]
+    return removed, added
+
+
+def _squash(lines):
+    return "".join("".join(lines).split())
+
+
+def _tokens(lines):
+    return [C_TOKEN.findall(line) for line in lines if line.strip()]
+
+
+def _code(hunk, removed, prefixes, block_comments):
+    """
+    Returns the removed (or added) lines of ``hunk`` that are not comments.
+
+    Context lines are walked too, so a line inside a ``/* ... */`` block
+    opened earlier in the hunk is recognized; a line starting with ``*``
+    outside such a block is code.
+    """
+    code = []
+    in_block = False
+    for line in hunk:
+        if line.is_added if removed else line.is_removed:
+            continue
+        text = line.value.rstrip("\n")
+        stripped = text.strip()
+        comment = in_block or stripped.startswith(prefixes)
+        if block_comments:
+            if not in_block and stripped.startswith("/*"):
+                in_block = comment = True
+                stripped = stripped[2:]
+            if in_block:
+                end = stripped.find("*/")
+                if end != -1:
+                    in_block = False
+                    # Code after the end of the block is still code.
+                    comment = not stripped[end + 2 :].strip()
+        if not comment and not line.is_context:
+            code.append(text)
+    return code
+
+
+def _has_generated_header(text):
+    """
+    Returns True when the comments at the top of ``text``, before its first
+    line of code, carry a generated-file marker.
+    """
+    for line in (text or "").splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if not stripped.startswith(HEADER_COMMENT_PREFIXES):
+            return False
+        if GENERATED_MARKERS.search(stripped):
+            return True
+    return False
+
+
+def _python_tokens(lines):
+    try:
+        tokens = tokenize.generate_tokens(io.StringIO("\n".join(lines) + "\n").readline)
+        return [tok.string for tok in tokens if tok.type not in IGNORED_TOKENS]
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        return None
+
+
+def _normalize(tree):
+    # Drops docstrings and sorts each run of consecutive imports.
+    for node in ast.walk(tree):
+        body = getattr(node, "body", None)
+        if not isinstance(body, list):
+            continue
+        if (
+            isinstance(node, DOCUMENTED_NODES)
+            and ast.get_docstring(node, clean=False) is not None
+        ):
+            body = body[1:] or [ast.Pass()]
+        normalized, imports = [], []
+        for statement in body + [None]:
+            if isinstance(statement, (ast.Import, ast.ImportFrom)):
+                imports.append(statement)
+                continue
+            normalized.extend(sorted(imports, key=ast.dump))
+            imports = []
+            if statement is not None:
+                normalized.append(statement)
+        node.body = normalized
+    return tree
+
+
+def python_semantics_unchanged(base_source, head_source):
+    """
+    Returns True when two versions of a Python module have the same AST once
+    docstrings are dropped and imports sorted, i.e. the change only touches
+    formatting, comments, docstrings or import order.
+    """
+    try:
+        base = _normalize(ast.parse(base_source))
+        head = _normalize(ast.parse(head_source))
+    except (SyntaxError, ValueError):
+        return False
+    return ast.dump(base) == ast.dump(head)
+
+
+class Triage:
+    """
+    Cheap static checks that skip hunks not worth a model call.
+
+    Files are skipped when they match an ignore glob or look vendored,
+    generated or minified. Hunks are skipped when they only change
+    whitespace, comments, import order or a version string, and Python
+    files whose AST is unchanged apart from docstrings and import order are
+    skipped whole.
+    Every skip is logged with its reason.
+    """
+
+    def __init__(self, ignore=(), max_line_length=500, source=None):
+        self.ignore = tuple(ignore)
+        self.max_line_length = max_line_length
+        self.source = source or get_source()
+        self.skipped = {}
+        self._file_reasons = {}
+
+    @classmethod
+    def from_config(cls):
+        """
+        Builds the triage described by ``REVIEW_CONFIG["triage"]``, or returns
+        None when it is disabled.
+        """
+        triage_config = REVIEW_CONFIG.get("triage", {})
+        if not triage_config.get("enabled", True):
+            return None
+        return cls(
+            ignore=triage_config.get("ignore", ()),
+            max_line_length=triage_config.get("maxLineLength", 500),
+        )
+
+    def file_reason(self, file):
+        if _matches(file.path, self.ignore):
+            return "matches an ignore glob"
+        if _matches(file.path, VENDORED_PATTERNS):
+            return "vendored code"
+        if _matches(file.path, GENERATED_PATTERNS):
+            return "generated file"
+
+        # One long line (a query, a regex) is fine; minified code is long
+        # lines throughout.
+        added = [
+            line.value.strip()
+            for hunk in file
+            for line in hunk
+            if line.is_added and line.value.strip()
+        ]
+        if added and sum(map(len, added)) / len(added) > self.max_line_length:
+            return "minified file"
+        if _has_generated_header(self._header(file)):
+            return "generated file"
+
+        # Without a checkout both versions would have to be downloaded.
+        if self.source.local and file.path.endswith(".py") and not file.is_added_file:
+            base_source = self.source.read_base(file.source_file[2:])
+            head_source = self.source.read(file.path)
+            if (
+                base_source is not None
+                and head_source is not None
+                and python_semantics_unchanged(base_source, head_source)
+            ):
+                return (
+                    "no semantic change (formatting, comments, docstrings or imports)"
+                )
+        return None
+
+    def hunk_reason(self, file, hunk):
+        removed, added = _changed(hunk)
+        extension = os.path.splitext(file.path)[1]
+        python = extension == ".py"
+        prefixes = LINE_COMMENT_PREFIXES.get(extension, ("//",))
+        block_comments = extension not in NO_BLOCK_COMMENTS
+
+        if python:
+            # Tokens keep indentation, statement ends and string literals,
+            # so equal tokens mean the change cannot alter behavior.
+            removed_tokens = _python_tokens(removed)
+            if removed_tokens is not None and removed_tokens == _python_tokens(added):
+                if _squash(removed) == _squash(added):
+                    return "whitespace-only change"
+                if [line.rstrip() for line in _code(hunk, True, prefixes, False)] == [
+                    line.rstrip() for line in _code(hunk, False, prefixes, False)
+                ]:
+                    return "comment-only change"
+                return "formatting-only change"
+        else:
+            if _tokens(removed) == _tokens(added):
+                return "whitespace-only change"
+            if _tokens(_code(hunk, True, prefixes, block_comments)) == _tokens(
+                _code(hunk, False, prefixes, block_comments)
+            ):
+                return "comment-only change"
+
+        changed = [line.strip() for line in removed + added if line.strip()]
+        strip = str.rstrip if python else str.strip
+        if all(IMPORT_LINE.match(line) for line in changed) and sorted(
+            strip(line) for line in removed if line.strip()
+        ) == sorted(strip(line) for line in added if line.strip()):
+            return "import reordering"
+        if all(VERSION_LINE.match(line) for line in changed):
+            return "version bump"
+        return None
+
+    def skip_reason(self, file, hunk):
+        """
+        Returns why ``hunk`` of ``file`` needs no review, or None.
+        """
+        if file.path not in self._file_reasons:
+            self._file_reasons[file.path] = self.file_reason(file)
+        reason = self._file_reasons[file.path] or self.hunk_reason(file, hunk)
+        if reason:
+            print(f"⏭️ Skipping {file.path} @{hunk.target_start}: {reason}")
+            self.skipped[reason] = self.skipped.get(reason, 0) + 1
+        return reason
+
+    def report(self):
+        for reason, count in sorted(self.skipped.items()):
+            print(f"Triage skipped {count} hunks: {reason}")
+
+    def _header(self, file):
+        if self.source.local:
+            text = self.source.read(file.path, limit=2048)
+            if text is not None:
+                return text
+        first = next(iter(file), None)
+        if first is not None and first.target_start == 1:
+            return "".join(
+                line.value for line in list(first)[:10] if not line.is_removed
+            )
+        return None
@@ -0,0 +1,390 @@
+import argparse
+import ast
+import os
+from concurrent.futures import ThreadPoolExecutor
+from .metrics import configure_logging, get_metrics, logger, span
+from .ollama_pool import get_pool
+from .file_source import GitHubFiles, get_source, set_source
+from .git_diff import load_sources
+from .github import GitHubAPI
+from .config import REVIEW_CONFIG
+from .generation_cache import GenerationCache
+
+# Bump when the test prompt changes, to invalidate cached suggestions.
+PROMPT_VERSION = 1
+
+# Identifies the bot's suggestions comment so later runs update it in place.
+TEST_COMMENT_MARKER = "<!-- smart-code-review:unittest -->"
+# GitHub rejects comments longer than 65536 characters.
+MAX_COMMENT_LENGTH = 65000
+
+
+class OllamaAPI:
+    def __init__(self, model="codegemma:7b-instruct", keep_alive=None, cache=None):
+        """
+        **Summary:**
+        Initializes the model for the object.
+
+        **Args:**
+            model (object): The model to initialize.
+            keep_alive (str, optional): How long Ollama keeps the model loaded.
+            cache (GenerationCache, optional): Cache of generated tests.
+
+        **Returns:**
+            None
+        """
+        self.pool = get_pool()
+        self.model = model
+        self.keep_alive = keep_alive
+        self.cache = cache
+
+    def cache_key(self, func):
+        if self.cache is None:
+            return None
+        return GenerationCache.make_key("unittest", self.model, PROMPT_VERSION, func)
+
+    def cached_unittest(self, func):
+        """
+        Returns the cached test suggestion for the function node ``func``, or
+        None.
+        """
+        key = self.cache_key(func)
+        return self.cache.get(key) if key is not None else None
+
+    def _payload(self, prompt):
+        payload = {"model": self.model, "prompt": prompt, "stream": False}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+
+    def suggest_unittest(self, code_snippet, cache_key=None):
+        """
+        Summary line.
+
+        Args:
+            code_snippet (str): Source code of the function to test.
+            cache_key (str, optional): Stores the suggestion in the cache under this key.
+
+        Returns:
+            str: API response.
+        """
+        prompt = f"""Generate a Python unittest (using unittest module) for the following function.
+Just output the test function code only. No explanations or markdown.
+
+Function:
+{code_snippet}
+"""
+        logger.debug("Prompt sent to ollama:\n%s", prompt)
+        with span("ollama_generation"):
+            response = self.pool.post(
+                "/api/generate", model=self.model, json=self._payload(prompt)
+            )
+        response.raise_for_status()
+        response_json = response.json()
+        get_metrics().record_generation(self.model, response_json)
+        logger.debug("Ollama response:\n%s", response_json.get("response", ""))
+        if "response" not in response_json:
+            raise KeyError(f"'response' key not found in API response: {response_json}")
+        suggestion = response_json["response"].strip()
+        if cache_key is not None and suggestion:
+            self.cache.put(cache_key, suggestion)
+        return suggestion
+
+
+def extract_new_functions(file_path, changed_lines, is_new_file=False, tree=None):
+    """
+    ## Function Docstring
+
+
+    Summary:
+       Identifies newly added or modified functions in a source code file.
+
+    Args:
+       file_path (str): Path to the source code file.
+       is_new_file (bool): Whether the file is newly created.
+       changed_lines (list): List of line numbers that have been modified.
+       tree (ast.Module, optional): Already parsed module, to avoid reading the file again.
+
+    Returns:
+       list: List of newly or modified functions in the file.
+    """
+    new_funcs = []
+    if tree is None:
+        with open(file_path, "r") as f:
+            source_code = f.read()
+            tree = ast.parse(source_code)
+
+    for node in ast.walk(tree):
+        """
+        Summary line.
+
+        Returns:
+            type: description.
+        """
+        if isinstance(node, ast.FunctionDef):
+            if is_new_file or node.lineno in changed_lines:
+                new_funcs.append(node)
+    return new_funcs
+
+
+def format_test_comment(file_path, test_suggestions):
+    """
+    Summary line.
+    Args:
+        func_name (str): Name of the function.
+        test_code (str): Test code for the function.
+    Returns:
+        str: HTML comment body with suggestions.
+    """
+    comment_body = f"### Unit Test Suggestions for `{file_path}`\n\n"
+    comment_body += "<details><summary>Show Suggestions</summary>\n\n"
+
+    for func_name, test_code in test_suggestions.items():
+        if not test_code.strip():
+            continue
+
+        # Remove any internal markdown fences from generated code
+        clean_test_code = test_code.replace("```python", "").replace("```", "").strip()
+
+        comment_body += f"#### `{func_name}`\n\n"
+        comment_body += "```python\n"
+        comment_body += clean_test_code + "\n"
+        comment_body += "```\n\n"
+
+    comment_body += "</details>"
+    return comment_body
+
+
+def select_new_functions(file_path, changed_lines, is_new, tree=None):
+    """
+    Summary:
+    Picks the functions worth suggesting tests for, skipping files with too many changes.
+
+    Args:
+        file_path (str): Path to the source code file.
+        changed_lines (list): List of line numbers that have been modified.
+        is_new (bool): Whether the file is newly created.
+        tree (ast.Module, optional): Already parsed module.
+
+    Returns:
+        list: The selected function nodes, empty if the file is skipped.
+    """
+    if len(changed_lines) > 100 and not is_new:
+        print(f"Too many changed lines in {file_path}. Skipping.")
+        return []
+
+    new_funcs = extract_new_functions(
+        file_path, changed_lines, is_new_file=is_new, tree=tree
+    )
+    if not new_funcs:
+        print(f"No new functions in changed lines for {file_path}. Skipping.")
+    return new_funcs
+
+
+def plan_suggestions(ollama, sources):
+    """
+    Summary:
+    Finds the functions of every file that need a test suggestion.
+
+    Args:
+        ollama (OllamaAPI): Client whose cache is consulted.
+        sources (dict): Parsed files, as returned by ``git_diff.load_sources``.
+
+    Returns:
+        tuple: Suggestions found in the cache, as ``{path: {name: code}}``, and
+        the remaining ``(path, name, code_snippet, cache_key)`` jobs.
+    """
+    suggestions = {}
+    jobs = []
+
+    for file_path, parsed in sources.items():
+        print(f"Processing file: {file_path}")
+        if parsed["is_new"]:
+            print(f"{file_path} is a new file. Processing all functions.")
+            changed_lines = list(range(1, parsed["source"].count("\n") + 2))
+        else:
+            changed_lines = parsed["added_lines"]
+        new_funcs = select_new_functions(
+            file_path, changed_lines, parsed["is_new"], tree=parsed["tree"]
+        )
+        file_suggestions = suggestions.setdefault(file_path, {})
+
+        for func in new_funcs:
+            code_snippet = ast.get_source_segment(parsed["source"], func)
+            if not code_snippet:
+                continue
+            cached = ollama.cached_unittest(func)
+            if cached:
+                file_suggestions[func.name] = cached
+            else:
+                jobs.append(
+                    (file_path, func.name, code_snippet, ollama.cache_key(func))
+                )
+
+    return suggestions, jobs
+
+
+def suggest_tests(ollama, sources, concurrency_limit=None):
+    """
+    Summary:
+    Generates test suggestions for the new functions of all files concurrently.
+
+    Args:
+        ollama (OllamaAPI): Client used for generation.
+        sources (dict): Parsed files, as returned by ``git_diff.load_sources``.
+        concurrency_limit (int, optional): Suggestions generated in parallel.
+
+    Returns:
+        dict: Suggested test code as ``{path: {function name: code}}``.
+    """
+    if concurrency_limit is None:
+        concurrency_limit = max(
+            REVIEW_CONFIG.get("concurrencyLimit", 1), ollama.pool.capacity
+        )
+    suggestions, jobs = plan_suggestions(ollama, sources)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency_limit)) as executor:
+        futures = [
+            (
+                file_path,
+                name,
+                executor.submit(ollama.suggest_unittest, code_snippet, cache_key),
+            )
+            for file_path, name, code_snippet, cache_key in jobs
+        ]
+        for file_path, name, future in futures:
+            print(f"Generating test for `{name}`...")
+            try:
+                suggestions[file_path][name] = future.result()
+            except Exception as e:
+                print(f"Failed to generate test for `{name}`: {e}")
+
+    return suggestions
+
+
+def format_test_summary(suggestions):
+    """
+    Summary:
+    Builds the single bot comment holding the test suggestions of all files.
+
+    Args:
+        suggestions (dict): Suggested test code as ``{path: {function name: code}}``.
+
+    Returns:
+        str: The comment body, or an empty string when there is nothing to post.
+    """
+    sections = [
+        format_test_comment(file_path, file_suggestions)
+        for file_path, file_suggestions in suggestions.items()
+        if any(code.strip() for code in file_suggestions.values())
+    ]
+    if not sections:
+        return ""
+
+    body = TEST_COMMENT_MARKER
+    for index, section in enumerate(sections):
+        if len(body) + len(section) > MAX_COMMENT_LENGTH:
+            body += f"\n\n_{len(sections) - index} more files omitted._"
+            break
+        body += "\n\n" + section
+    return body
+
+
+def post_test_summary(suggestions, github=None):
+    """
+    Summary:
+    Posts the test suggestions of all files as one pull request comment, updating
+    the comment of a previous run in place when there is one.
+
+    Args:
+        suggestions (dict): Suggested test code as ``{path: {function name: code}}``.
+        github (GitHubAPI, optional): Client to use.
+
+    Returns:
+        None
+    """
+    comment_body = format_test_summary(suggestions)
+    if not comment_body:
+        print("No valid suggestions to post.")
+        return
+
+    github_token = os.getenv("GITHUB_TOKEN")
+    pr_number = os.getenv("PR_NUMBER")
+    repo_owner = os.getenv("GITHUB_REPOSITORY_OWNER")
+    repo_name = (os.getenv("GITHUB_REPOSITORY") or "").split("/")[-1]
+
+    if not all([github_token, pr_number, repo_owner, repo_name]):
+        print("Missing required environment variables for posting a comment.")
+        return
+
+    github = github or GitHubAPI(github_token)
+    for comment in github.get_issue_comments(repo_owner, repo_name, pr_number):
+        body = comment.get("body") or ""
+        # Never overwrite a look-alike comment someone else posted.
+        if body.startswith(TEST_COMMENT_MARKER) and github.is_own_comment(comment):
+            github.update_issue_comment(
+                repo_owner, repo_name, comment["id"], comment_body
+            )
+            print("Updated unit test suggestions comment.")
+            return
+
+    github.post_comment(repo_owner, repo_name, pr_number, comment_body)
+    print("Posted unit test suggestions comment.")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Suggest unit tests for the new functions of a pull request"
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        help="Only process these files (default: every changed Python file)",
+    )
+    parser.add_argument(
+        "--no-checkout",
+        action="store_true",
+        default=os.getenv("REVIEW_SOURCE") == "github",
+        help="Read the diff and files from the GitHub API instead of git",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Summary:
+    Suggests unit tests for the changed files and posts them as one comment.
+
+    Args:
+        argv (list, optional): Command line arguments.
+
+    Returns:
+        None
+    """
+    args = parse_args(argv)
+    configure_logging()
+    if args.no_checkout:
+        set_source(
+            GitHubFiles(
+                GitHubAPI(os.getenv("GITHUB_TOKEN")),
+                os.getenv("GITHUB_REPOSITORY_OWNER"),
+                (os.getenv("GITHUB_REPOSITORY") or "").split("/")[-1],
+                os.getenv("PR_NUMBER"),
+            )
+        )
+    files = get_source().iter_diff(args.paths, diff_filter="d", pathspecs=["*.py"])
+    sources = load_sources(files, args.paths, read=get_source().read)
+
+    cache = GenerationCache.from_config()
+    try:
+        suggestions = suggest_tests(OllamaAPI(cache=cache), sources)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    post_test_summary(suggestions)
+    get_metrics().finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import os
+import sys
+
+from unidiff import PatchSet
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+# The fake GitHub and Ollama servers of the benchmarks.
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+
+def make_file(path, hunk, source_start=10, target_start=10):
+    """
+    Parses a one-hunk diff of ``path``. ``hunk`` holds the diff lines of the
+    hunk with their " ", "-" or "+" prefix.
+    """
+    lines = hunk.splitlines()
+    removed = sum(1 for line in lines if not line.startswith("+"))
+    added = sum(1 for line in lines if not line.startswith("-"))
+    diff = (
+        f"diff --git a/{path} b/{path}\n"
+        f"--- a/{path}\n"
+        f"+++ b/{path}\n"
+        f"@@ -{source_start},{removed} +{target_start},{added} @@\n"
+        + "".join(line + "\n" for line in lines)
+    )
+    return PatchSet(diff)[0]
@@ -0,0 +1,104 @@
+import pytest
+
+import fake_services
+from smart_code_review_bot.ollama_pool import Endpoint, OllamaPool
+
+REQUEST = {"model": "codellama", "prompt": "Write a test", "stream": False}
+
+
+class FailingOllamaHandler(fake_services.FakeOllamaHandler):
+    # Healthy to /api/ps probes, but every generation fails.
+    def do_POST(self):
+        self._read_json()
+        self.recorder.record("POST", self.path)
+        self._send(500, b'{"error": "model runner crashed"}')
+
+
+def start_ollama(handler=fake_services.FakeOllamaHandler):
+    server, url, recorder = fake_services.start(handler, tps=10_000.0)
+    return server, Endpoint(url, max_concurrency=2), recorder
+
+
+def posts(recorder):
+    calls, _ = recorder.snapshot()
+    return sum(1 for method, path in calls if method == "POST")
+
+
+@pytest.fixture
+def servers():
+    started = [start_ollama(FailingOllamaHandler), start_ollama()]
+    yield started
+    for server, _, _ in started:
+        server.shutdown()
+        server.server_close()
+
+
+def test_failed_endpoint_is_skipped_until_its_cooldown(servers):
+    (_, broken, broken_calls), (_, working, working_calls) = servers
+    pool = OllamaPool([broken, working], failure_cooldown=60)
+
+    for _ in range(2):
+        response = pool.post("/api/generate", model="codellama", json=REQUEST)
+        assert response.status_code == 200
+        assert response.json()["done"] is True
+
+    # The second request went straight to the working endpoint.
+    assert (posts(broken_calls), posts(working_calls)) == (1, 2)
+    assert not broken.healthy
+    assert working.healthy
+    assert working.loaded_models == {"codellama:latest"}
+    assert broken.outstanding == working.outstanding == 0
+
+
+def test_failed_endpoint_returns_after_its_cooldown(servers):
+    (_, broken, broken_calls), (_, working, _) = servers
+    pool = OllamaPool([broken, working], failure_cooldown=0)
+
+    pool.post("/api/generate", model="codellama", json=REQUEST)
+    # Its /api/ps probe succeeds again, so it is back in rotation. Without a
+    # model the working endpoint, which has it loaded now, is not preferred.
+    pool.post("/api/generate", json=REQUEST)
+    assert posts(broken_calls) == 2
+
+
+def test_error_of_the_last_endpoint_is_returned():
+    started = [start_ollama(FailingOllamaHandler) for _ in range(2)]
+    try:
+        pool = OllamaPool([endpoint for _, endpoint, _ in started])
+        response = pool.post("/api/generate", model="codellama", json=REQUEST)
+        assert response.status_code == 500
+        assert all(posts(recorder) == 1 for _, _, recorder in started)
+        assert all(endpoint.outstanding == 0 for _, endpoint, _ in started)
+    finally:
+        for server, _, _ in started:
+            server.shutdown()
+            server.server_close()
+
+
+def test_streamed_response_holds_its_slot_until_closed(servers):
+    _, (_, working, _) = servers
+    pool = OllamaPool([working, Endpoint("http://127.0.0.1:9", 1)])
+
+    response = pool.post(
+        "/api/generate", model="codellama", json=dict(REQUEST, stream=True), stream=True
+    )
+    assert working.outstanding == 1
+    response.close()
+    assert working.outstanding == 0
+
+
+def test_least_loaded_endpoint_with_the_model_is_picked():
+    first = Endpoint("http://first", max_concurrency=2)
+    second = Endpoint("http://second", max_concurrency=4)
+    pool = OllamaPool([first, second], health_check_interval=3600)
+    for endpoint in (first, second):
+        endpoint.checked_at = float("inf")
+
+    assert pool.acquire() is first
+    # 1/2 of first against 0/4 of second.
+    assert pool.acquire() is second
+    assert pool.acquire() is second
+
+    second.loaded_models.add("codellama:latest")
+    first.outstanding = second.outstanding = 0
+    assert pool.acquire("codellama") is second
@@ -0,0 +1,88 @@
+from conftest import make_file
+from smart_code_review_bot.diff_lines import DiffLines
+from smart_code_review_bot.packing import (
+    demux_reviews,
+    estimate_tokens,
+    make_segment,
+    split_segment,
+)
+
+
+def make_segment_of(path, hunk, target_start=10):
+    file = make_file(path, hunk, target_start=target_start)
+    return make_segment(path, DiffLines.from_hunk(file[0]))
+
+
+def test_small_segment_is_not_split():
+    segment = make_segment_of("app.py", " a = 1\n+b = 2")
+    assert split_segment(segment, max_tokens=1000) == [segment]
+
+
+def test_split_reviews_every_added_line_once():
+    hunk = "\n".join(f"+value_{i} = compute({i})" for i in range(40))
+    segment = make_segment_of("app.py", hunk, target_start=1)
+    pieces = split_segment(segment, max_tokens=100, overlap_lines=3)
+
+    assert len(pieces) > 1
+    added = [line for piece in pieces for line in piece["added_lines"]]
+    assert added == list(range(1, 41))
+    for previous, piece in zip(pieces, pieces[1:]):
+        # Overlapping lines come back as untagged context.
+        assert piece["start"] <= previous["end"]
+        assert piece["added_lines"][0] == previous["end"] + 1
+    assert all(estimate_tokens(piece["content"]) <= 130 for piece in pieces)
+
+
+def test_split_prefers_blank_lines():
+    # Indented lines are no boundary, so only the blank lines are.
+    hunk = "\n".join(f"+    x{i} = {i}" if i % 10 else "+" for i in range(1, 40))
+    segment = make_segment_of("app.py", hunk, target_start=1)
+    pieces = split_segment(segment, max_tokens=80, overlap_lines=0)
+    assert all(piece["end"] % 10 == 9 for piece in pieces[:-1])
+
+
+def pack():
+    return [
+        make_segment_of("a.py", " x = 1\n+y = 2\n+z = 3", target_start=10),
+        make_segment_of("b.py", "+w = 4", target_start=5),
+    ]
+
+
+def test_reviews_are_routed_to_their_segment():
+    reviews = [
+        {"path": "b.py", "line": 5, "message": "b"},
+        {"path": "a.py", "line": "12", "message": "a"},
+    ]
+    assert demux_reviews(pack(), reviews) == [
+        [{"line": 12, "message": "a"}],
+        [{"line": 5, "message": "b"}],
+    ]
+
+
+def test_review_off_the_added_lines_becomes_a_file_comment():
+    reviews = [{"path": "a.py", "line": 10, "message": "context line"}]
+    assert demux_reviews(pack(), reviews) == [
+        [{"line": None, "message": "context line"}],
+        [],
+    ]
+
+
+def test_review_without_path_is_matched_on_its_line():
+    reviews = [{"line": 5, "message": "no path"}]
+    assert demux_reviews(pack(), reviews) == [[], [{"line": 5, "message": "no path"}]]
+
+
+def test_unmatched_review_is_dropped():
+    reviews = [
+        {"path": "c.py", "line": 1, "message": "unknown file"},
+        {"line": 99, "message": "unknown line"},
+    ]
+    assert demux_reviews(pack(), reviews) == [[], []]
+
+
+def test_single_segment_keeps_unmatched_reviews():
+    (segment,) = pack()[1:]
+    reviews = [{"line": 99, "message": "somewhere"}]
+    assert demux_reviews([segment], reviews) == [
+        [{"line": None, "message": "somewhere"}]
+    ]
@@ -0,0 +1,58 @@
+from smart_code_review_bot.review_state import STATE_PATTERN, ReviewState
+
+
+def test_update_records_reviewed_and_forgets_outdated_hunks():
+    state = ReviewState("abc", {"a.py": {"1", "2"}, "gone.py": {"3"}})
+    state.update({"a.py": {"2", "4"}, "b.py": {"5"}}, {"a.py": {"4"}, "b.py": {"5"}})
+    assert state.files == {"a.py": {"2", "4"}, "b.py": {"5"}}
+    assert len(state) == 3
+    assert state.is_reviewed("a.py", "4")
+    assert not state.is_reviewed("a.py", "1")
+
+
+def test_update_drops_files_left_without_reviewed_hunks():
+    state = ReviewState("abc", {"a.py": {"1"}})
+    state.update({"a.py": {"2"}}, {})
+    assert state.files == {}
+
+
+def test_partial_update_keeps_files_that_were_not_read():
+    state = ReviewState("abc", {"a.py": {"1", "2"}, "b.py": {"3"}})
+    state.update({"a.py": {"2"}}, {}, whole_diff=False)
+    assert state.files == {"a.py": {"2"}, "b.py": {"3"}}
+
+
+def test_hunk_ids_are_kept_per_file():
+    state = ReviewState("abc", {"a.py": {"1"}})
+    assert not state.is_reviewed("b.py", "1")
+
+
+class FakeGitHub:
+    def __init__(self, comments, login="review-bot"):
+        self.comments = comments
+        self.login = login
+
+    def get_issue_comments(self, owner, repo, pr_number):
+        return self.comments
+
+    def is_own_comment(self, comment):
+        return comment["user"]["login"] == self.login
+
+
+def test_render_round_trips_through_load():
+    state = ReviewState("abcdef0123", {"a.py": {"2", "1"}})
+    comment = {"id": 7, "user": {"login": "review-bot"}, "body": state.render()}
+    loaded = ReviewState.load(FakeGitHub([comment]), "o", "r", 1)
+    assert (loaded.sha, loaded.files, loaded.comment_id) == (
+        "abcdef0123",
+        {"a.py": {"1", "2"}},
+        7,
+    )
+    assert STATE_PATTERN.search(comment["body"])
+
+
+def test_load_ignores_markers_posted_by_others():
+    forged = ReviewState("abc", {"a.py": {"1"}}).render()
+    comment = {"id": 7, "user": {"login": "someone"}, "body": forged}
+    loaded = ReviewState.load(FakeGitHub([comment]), "o", "r", 1)
+    assert (loaded.sha, loaded.files, loaded.comment_id) == (None, {}, None)
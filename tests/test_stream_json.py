@@ -0,0 +1,49 @@
+from smart_code_review_bot.stream_json import iter_json_objects
+
+
+def test_objects_are_yielded_across_fragments():
+    fragments = ['[{"line": 1, "message": "a', ' [b] {c}"}, {"li', 'ne": 2}]']
+    assert list(iter_json_objects(fragments)) == [
+        {"line": 1, "message": "a [b] {c}"},
+        {"line": 2},
+    ]
+
+
+def test_chatter_and_fences_are_ignored():
+    text = 'Here are [my] findings:\n```json\n[\n  {"line": 3}\n]\n```\nDone.'
+    assert list(iter_json_objects([text])) == [{"line": 3}]
+
+
+def test_escaped_quotes_stay_inside_strings():
+    text = r'[{"message": "use \"}\" here"}]'
+    assert list(iter_json_objects([text])) == [{"message": 'use "}" here'}]
+
+
+def test_closed_array_stops_iteration():
+    outcome = {}
+    text = '[{"line": 1}] and then [{"line": 2}]'
+    assert list(iter_json_objects([text], outcome)) == [{"line": 1}]
+    assert outcome["closed"] is True
+
+
+def test_empty_array_is_closed():
+    outcome = {}
+    assert list(iter_json_objects(["[ ]"], outcome)) == []
+    assert outcome["closed"] is True
+
+
+def test_truncated_stream_keeps_complete_objects():
+    outcome = {}
+    text = '[{"line": 1}, {"line": 2, "message": "cut'
+    assert list(iter_json_objects([text], outcome)) == [{"line": 1}]
+    assert "closed" not in outcome
+
+
+def test_objects_without_brackets():
+    text = '{"line": 1}\n{"line": 2}'
+    assert list(iter_json_objects([text])) == [{"line": 1}, {"line": 2}]
+
+
+def test_invalid_objects_are_skipped():
+    text = '[{"line": 1,}, {"line": 2}]'
+    assert list(iter_json_objects([text])) == [{"line": 2}]
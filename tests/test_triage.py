@@ -0,0 +1,79 @@
+import pytest
+
+from conftest import make_file
+from smart_code_review_bot.triage import Triage
+
+
+class RemoteSource:
+    # No checkout: triage only sees the diff.
+    local = False
+
+    def read(self, path, limit=-1):
+        return None
+
+
+def hunk_reason(path, hunk):
+    file = make_file(path, hunk)
+    return Triage(source=RemoteSource()).hunk_reason(file, file[0])
+
+
+@pytest.mark.parametrize(
+    "path, hunk",
+    [
+        ("main.go", "-*p = 1\n+*p = 2"),
+        ("price.js", " total = price\n-    * rate;\n+    * tax;"),
+        ("main.go", "-/* a */ x := 1\n+/* b */ x := 2"),
+        ("app.js", "-a + +b;\n+a ++b;"),
+        ("app.js", '-label = "a b";\n+label = "ab";'),
+        ("app.py", '-label = "a b"\n+label = "ab"'),
+        ("app.py", " def f(x):\n-    return x\n+    return\n+    x"),
+        ("app.py", "-foo(bar)\n+foo\n+(bar)"),
+    ],
+)
+def test_behavior_changes_are_reviewed(path, hunk):
+    assert hunk_reason(path, hunk) is None
+
+
+@pytest.mark.parametrize(
+    "path, hunk, reason",
+    [
+        ("app.js", "-x = 1;\n+x  =  1;", "whitespace-only change"),
+        ("app.py", "-x = f(1,2)\n+x = f(1, 2)", "whitespace-only change"),
+        ("app.js", " /**\n-  * old\n+  * new\n  */", "comment-only change"),
+        ("app.php", "-// note\n+# note", "comment-only change"),
+        ("app.py", "-# a\n+# b\n x = 1", "comment-only change"),
+        (
+            "app.py",
+            "-import os\n-import re\n+import re\n+import os",
+            "import reordering",
+        ),
+        ("setup.py", '-version = "1.0"\n+version = "1.1"', "version bump"),
+    ],
+)
+def test_no_op_changes_are_skipped(path, hunk, reason):
+    assert hunk_reason(path, hunk) == reason
+
+
+def file_reason(path, hunk):
+    file = make_file(path, hunk, source_start=1, target_start=1)
+    return Triage(source=RemoteSource()).file_reason(file)
+
+
+def test_generated_marker_in_header():
+    hunk = "+# This file is auto-generated, do not edit.\n+x = 1"
+    assert file_reason("models.py", hunk) == "generated file"
+
+
+def test_identifier_is_not_a_generated_marker():
+    hunk = "+# Maps autogenerated_ids to names.\n+x = 1"
+    assert file_reason("models.py", hunk) is None
+
+
+def test_one_long_line_is_not_minified():
+    hunk = "".join(f"+x{i} = {i}\n" for i in range(10)) + f"+QUERY = '{'a' * 600}'"
+    assert file_reason("query.py", hunk) is None
+
+
+def test_long_lines_throughout_are_minified():
+    hunk = "\n".join(f"+var a{i}={'1+' * 300}1;" for i in range(3))
+    assert file_reason("app.js", hunk) == "minified file"